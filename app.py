@@ -6,9 +6,22 @@ Run with: streamlit run app.py
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 import warnings
+from clustering import account_features, cluster_segments, load_or_fit
+from cube import CUBE_VERSION, build_cube, rollup
+from dataset_store import DatasetStore
+from disk_cache import read_cached, write_cached
+from figure_cache import FigureCache
+from filters import FG_RANGE, Filters, apply_filters, sorted_layout
+from lazy_tables import LazyTables
+from loader import memory_footprint, sentiment_coverage
+from metrics import build_daily_metrics
+from segments import attach_segments, build_trader_stats
+from sentiment_windows import join_sentiment_windows
+from positions import join_positions, position_metrics
+from risk import build_risk_tables
+from significance import compare_means
+from profiling import PipelineProfiler, activate, dump_cprofile, stage, start_cprofile
 warnings.filterwarnings('ignore')
 
 # Page config
@@ -46,91 +59,162 @@ st.sidebar.title("Navigation")
 page = st.sidebar.radio("Go to", ["Overview", "Data Preparation", "Performance Analysis", 
                                    "Behavioral Analysis", "Trader Segments", "Strategy Recommendations"])
 
+# Derived tables each page reads (built on first access, see LazyTables)
+PAGE_TABLES = {
+    "Overview": ['trades_view', 'daily_metrics'],
+    "Data Preparation": ['daily_metrics', 'positions'],
+    "Performance Analysis": ['daily_metrics', 'risk'],
+    "Behavioral Analysis": ['daily_metrics', 'positions', 'cube'],
+    "Trader Segments": ['daily_metrics', 'segments'],
+    "Strategy Recommendations": ['daily_metrics', 'segments']
+}
+
+# Stage timings for this rerun (optionally with a full cProfile capture)
+PROFILE_DIR = '.cache/profiles'
+profiler = PipelineProfiler()
+activate(profiler)
+cprofile = start_cprofile() if st.sidebar.button("⏱ Profile this rerun (cProfile)") else None
+
 # Load data function
-@st.cache_data
+@st.cache_resource
+def dataset_store():
+    # One read-only copy of the datasets per process, shared by every session
+    return DatasetStore()
+
 def load_data():
     try:
-        fear_greed = pd.read_csv('fear_greed_index.csv')
-        trades = pd.read_csv('historical_data.csv')
-        
-        # Convert timestamps
-        fear_greed['date'] = pd.to_datetime(fear_greed['date'])
-        trades['Timestamp IST'] = pd.to_datetime(trades['Timestamp IST'], format='%d-%m-%Y %H:%M')
-        trades['date'] = pd.to_datetime(trades['Timestamp IST'].dt.date)
-        
-        # Merge
-        trades_merged = trades.merge(fear_greed[['date', 'value', 'classification']], 
-                                      on='date', how='left')
-        trades_merged.rename(columns={'value': 'fg_value', 'classification': 'sentiment'}, inplace=True)
-        
-        return fear_greed, trades, trades_merged
+        return dataset_store()
     except Exception as e:
         st.error(f"Error loading data: {e}")
-        return None, None, None
+        return None
 
 # Process data function
+def process_data(store, coins=(), leverage_baselines=('mean',)):
+    """Daily metrics (optionally from the selected coins' trades only) and their FilterIndex."""
+    def build():
+        trades_merged = store.trades_merged
+        if coins:
+            trades_merged = trades_merged[trades_merged['Coin'].isin(coins)]
+        daily_metrics = build_daily_metrics(trades_merged, leverage_baselines=leverage_baselines)
+        # 3-day average, regime length and previous-day sentiment
+        return sorted_layout(join_sentiment_windows(daily_metrics, store.fear_greed))
+    return store.table(('daily_metrics', coins, leverage_baselines), build)
+
+# Exposure and holding periods per (Account, date) from the reconstructed positions
+def position_data(store, coins=()):
+    def build():
+        trades_merged = store.trades_merged
+        if coins:
+            trades_merged = trades_merged[trades_merged['Coin'].isin(coins)]
+        return position_metrics(trades_merged)
+    return store.table(('positions', coins), build)
+
+# (date, hour, Coin, segment, sentiment) cube over all trades, kept on disk per dataset
+def cube_data(store):
+    def build():
+        key = f"{store.version}-v{CUBE_VERSION}"
+        cube = read_cached('cube', key)
+        if cube is None:
+            daily_metrics, _ = process_data(store)
+            cube = build_cube(store.trades_merged, build_trader_stats(daily_metrics))
+            write_cached('cube', key, cube)
+        return cube
+    return store.table('cube', build)
+
+# k-means centroids fitted on all accounts, cached on disk across restarts
+def cluster_model(store):
+    def build():
+        daily_metrics, _ = process_data(store)
+        return load_or_fit(account_features(daily_metrics, build_trader_stats(daily_metrics)))
+    return store.table('cluster_model', build)
+
+# Segment tables
+def segment_data(store, filters, daily_metrics):
+    def build():
+        trader_stats = cluster_segments(daily_metrics, build_trader_stats(daily_metrics), cluster_model(store))
+        return trader_stats, attach_segments(daily_metrics, trader_stats)
+    return store.table(('segments', filters), build)
+
+# Drawdown, Sharpe and Sortino per account and per (account, sentiment group)
+def risk_data(store, filters, daily_metrics):
+    return store.table(('risk', filters), lambda: build_risk_tables(daily_metrics))
+
+# Bootstrap CI and permutation p-value for a difference in means (b - a); large
+# samples use the normal approximation. Single-process: forking a pool per
+# session from the threaded server costs more than it saves at dashboard sizes
 @st.cache_data
-def process_data(trades_merged):
-    # Daily metrics
-    daily_metrics = trades_merged.groupby(['Account', 'date']).agg({
-        'Closed PnL': 'sum',
-        'Size USD': ['sum', 'mean', 'count'],
-        'Side': lambda x: (x == 'BUY').sum() / len(x),
-        'sentiment': 'first',
-        'fg_value': 'first'
-    }).reset_index()
-    
-    daily_metrics.columns = ['Account', 'date', 'daily_pnl', 'total_volume', 
-                             'avg_trade_size', 'num_trades', 'long_ratio', 'sentiment', 'fg_value']
-    
-    # Win rate
-    win_rate = trades_merged[trades_merged['Closed PnL'] != 0].groupby(['Account', 'date']).apply(
-        lambda x: (x['Closed PnL'] > 0).sum() / len(x) if len(x) > 0 else 0
-    ).reset_index(name='win_rate')
-    
-    daily_metrics = daily_metrics.merge(win_rate, on=['Account', 'date'], how='left')
+def compare(a, b):
+    return compare_means(a, b, workers=1)
+
+def significance_caption(result, label):
+    test = "permutation p" if result.method == 'resampling' else "normal-approximation p"
+    return (f"{label}: {result.diff:+.2f} (95% CI {result.ci_low:+.2f} to {result.ci_high:+.2f}), "
+            f"{test} = {result.p_value:.3f}")
+
+# Rendered charts, shared by every session in this process
+@st.cache_resource
+def figure_cache():
+    return FigureCache()
+
+def render_cached(key, chart, *args):
+    # charts (and matplotlib) are only imported once a figure has to be drawn
+    def build():
+        import charts
+        return getattr(charts, chart)(*args)
+    return figure_cache().get_or_render(key, build)
+
+# Load data
+with stage('load_data') as record:
+    store = load_data()
+    if store is not None:
+        record.frame(store.trades_merged)
+
+if store is not None:
+    fear_greed, trades, trades_merged = store.fear_greed, store.trades, store.trades_merged
+    trade_index, dataset_version = store.trade_index, store.version
     
-    # Leverage proxy
-    account_avg_size = trades_merged.groupby('Account')['Size USD'].mean()
-    trades_merged['leverage_proxy'] = trades_merged.apply(
-        lambda x: x['Size USD'] / account_avg_size[x['Account']], axis=1
-    )
+    # Filters
+    st.sidebar.markdown("---")
+    st.sidebar.subheader("Filters")
+    first_day, last_day = trade_index.first_day, trade_index.last_day
+    date_range = st.sidebar.date_input("Date range", (first_day, last_day), min_value=first_day, max_value=last_day)
+    fg_range = st.sidebar.slider("Fear & Greed index", *FG_RANGE, FG_RANGE)
+    coins = st.sidebar.multiselect("Coins", list(trades_merged['Coin'].cat.categories))
+    accounts = st.sidebar.multiselect("Accounts", list(trade_index.accounts))
     
-    daily_leverage = trades_merged.groupby(['Account', 'date'])['leverage_proxy'].mean().reset_index()
-    daily_metrics = daily_metrics.merge(daily_leverage, on=['Account', 'date'], how='left')
+    # A range still being picked has only its start date
+    start, end = (tuple(date_range) + (None,))[:2]
+    filters = Filters(start, end, fg_range, tuple(coins), tuple(accounts))
     
-    # Additional metrics
-    daily_metrics['short_ratio'] = 1 - daily_metrics['long_ratio']
-    daily_metrics = daily_metrics.sort_values(['Account', 'date'])
-    daily_metrics['cumulative_pnl'] = daily_metrics.groupby('Account')['daily_pnl'].cumsum()
+    def filtered_daily_metrics(get):
+        daily_metrics, daily_index = process_data(store, filters.coins)
+        return apply_filters(daily_metrics, daily_index, filters)
     
-    # Sentiment groups
-    daily_metrics['sentiment_group'] = daily_metrics['sentiment'].map({
-        'Extreme Fear': 'Fear',
-        'Fear': 'Fear',
-        'Neutral': 'Neutral',
-        'Greed': 'Greed',
-        'Extreme Greed': 'Greed'
-    })
+    tables = LazyTables({
+        'daily_metrics': filtered_daily_metrics,
+        'trades_view': lambda get: apply_filters(trades_merged, trade_index, filters),
+        'positions': lambda get: join_positions(get('daily_metrics'), position_data(store, filters.coins)),
+        'segments': lambda get: segment_data(store, filters, get('daily_metrics')),
+        'risk': lambda get: risk_data(store, filters, get('daily_metrics')),
+        'cube': lambda get: cube_data(store)
+    }, declared=PAGE_TABLES[page])
     
-    return daily_metrics
-
-# Load data
-fear_greed, trades, trades_merged = load_data()
-
-if trades_merged is not None:
-    daily_metrics = process_data(trades_merged)
+    # Warn rather than st.stop() so the timings panel and profiler teardown below still run
+    if tables['daily_metrics'].empty:
+        st.warning("No trader-days match the current filters.")
     
     # OVERVIEW PAGE
-    if page == "Overview":
+    elif page == "Overview":
         st.header("📈 Project Overview")
+        trades_view = tables['trades_view']
+        daily_metrics = tables['daily_metrics']
         
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Total Trades", f"{len(trades):,}")
+            st.metric("Total Trades", f"{len(trades_view):,}")
         with col2:
-            st.metric("Unique Traders", trades['Account'].nunique())
+            st.metric("Unique Traders", daily_metrics['Account'].nunique())
         with col3:
             st.metric("Trading Days", daily_metrics['date'].nunique())
         with col4:
@@ -148,9 +232,9 @@ if trades_merged is not None:
             st.write(f"- Sentiment Categories: {fear_greed['classification'].nunique()}")
             
             st.write("\n**Trading Data:**")
-            st.write(f"- Date Range: {trades['date'].min().date()} to {trades['date'].max().date()}")
-            st.write(f"- Total Trades: {len(trades):,}")
-            st.write(f"- Unique Accounts: {trades['Account'].nunique()}")
+            st.write(f"- Date Range: {trades_view['date'].min().date()} to {trades_view['date'].max().date()}")
+            st.write(f"- Total Trades: {len(trades_view):,}")
+            st.write(f"- Unique Accounts: {daily_metrics['Account'].nunique()}")
         
         with col2:
             st.subheader("🎯 Analysis Objectives")
@@ -167,29 +251,13 @@ if trades_merged is not None:
         st.markdown("---")
         st.subheader("📉 Sentiment Distribution")
         
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
-        
-        # Sentiment counts
-        sentiment_counts = daily_metrics['sentiment'].value_counts()
-        ax1.bar(sentiment_counts.index, sentiment_counts.values, color=['red', 'orange', 'gray', 'lightgreen', 'green'])
-        ax1.set_title('Trading Days by Sentiment', fontsize=14, fontweight='bold')
-        ax1.set_xlabel('Sentiment')
-        ax1.set_ylabel('Number of Days')
-        ax1.tick_params(axis='x', rotation=45)
-        
-        # Fear/Greed groups
-        group_counts = daily_metrics['sentiment_group'].value_counts()
-        colors = {'Fear': 'red', 'Neutral': 'gray', 'Greed': 'green'}
-        ax2.pie(group_counts.values, labels=group_counts.index, autopct='%1.1f%%',
-                colors=[colors[x] for x in group_counts.index], startangle=90)
-        ax2.set_title('Sentiment Group Distribution', fontsize=14, fontweight='bold')
-        
-        plt.tight_layout()
-        st.pyplot(fig)
+        with stage('overview.plot'):
+            st.image(render_cached(('Overview', dataset_version, filters), 'overview_figure', daily_metrics))
     
     # DATA PREPARATION PAGE
     elif page == "Data Preparation":
         st.header("🔧 Data Preparation")
+        daily_metrics = tables['daily_metrics']
         
         st.subheader("Dataset Summary")
         
@@ -207,16 +275,28 @@ if trades_merged is not None:
             st.write(f"Shape: {trades.shape}")
             st.write(f"Missing values: {trades.isnull().sum().sum()}")
         
+        coverage = sentiment_coverage(trades, fear_greed)
+        if sum(coverage.values()):
+            st.warning(f"{sum(coverage.values()):,} trades have no sentiment data: "
+                       f"{coverage['before_index']:,} before and {coverage['after_index']:,} after the index range, "
+                       f"{coverage['missing_days']:,} on days missing from the index")
+        
+        with st.expander("Memory footprint per column"):
+            footprint = memory_footprint(trades_merged)
+            st.write(f"Total: {footprint['MB'].sum():.1f} MB")
+            st.dataframe(footprint)
+        
         st.markdown("---")
         st.subheader("Created Metrics")
         
         st.write("**Daily Metrics per Trader:**")
-        st.dataframe(daily_metrics.head(10))
+        st.dataframe(tables['positions'].head(10))
         
         st.write("\n**Metric Descriptions:**")
         metrics_desc = pd.DataFrame({
             'Metric': ['daily_pnl', 'win_rate', 'avg_trade_size', 'num_trades', 
-                      'long_ratio', 'leverage_proxy', 'cumulative_pnl'],
+                      'long_ratio', 'leverage_proxy', 'cumulative_pnl', 'fg_ma3',
+                      'regime_days', 'fg_lag1', 'max_concurrent_notional', 'avg_holding_hours'],
             'Description': [
                 'Sum of closed PnL per trader per day',
                 'Percentage of profitable trades',
@@ -224,7 +304,12 @@ if trades_merged is not None:
                 'Number of trades per day',
                 'Proportion of buy vs sell trades',
                 'Position size relative to trader average',
-                'Running total of profits/losses'
+                'Running total of profits/losses',
+                'Trailing 3-day average of the Fear & Greed index',
+                'Consecutive days the 3-day average has stayed in its band',
+                "Previous day's Fear & Greed index",
+                'Largest open notional across all coins during the day',
+                'Mean holding time of positions closed that day'
             ]
         })
         st.table(metrics_desc)
@@ -232,13 +317,15 @@ if trades_merged is not None:
     # PERFORMANCE ANALYSIS PAGE
     elif page == "Performance Analysis":
         st.header("📊 Performance Analysis: Fear vs Greed")
+        daily_metrics = tables['daily_metrics']
         
         # Summary stats
-        performance_comparison = daily_metrics.groupby('sentiment_group').agg({
-            'daily_pnl': ['mean', 'median', 'std'],
-            'win_rate': 'mean',
-            'num_trades': 'mean'
-        }).round(2)
+        with stage('performance.aggregate'):
+            performance_comparison = daily_metrics.groupby('sentiment_group').agg({
+                'daily_pnl': ['mean', 'median', 'std'],
+                'win_rate': 'mean',
+                'num_trades': 'mean'
+            }).round(2)
         
         st.subheader("Performance Metrics by Sentiment")
         st.dataframe(performance_comparison)
@@ -246,54 +333,16 @@ if trades_merged is not None:
         st.markdown("---")
         
         # Visualizations
-        fig, axes = plt.subplots(2, 2, figsize=(15, 10))
-        
-        # PnL by sentiment
-        daily_metrics.boxplot(column='daily_pnl', by='sentiment_group', ax=axes[0, 0])
-        axes[0, 0].set_title('Daily PnL Distribution by Sentiment')
-        axes[0, 0].set_xlabel('Sentiment')
-        axes[0, 0].set_ylabel('Daily PnL (USD)')
-        plt.sca(axes[0, 0])
-        plt.xticks(rotation=0)
-        
-        # Win rate
-        sentiment_win_rate = daily_metrics.groupby('sentiment_group')['win_rate'].mean()
-        axes[0, 1].bar(sentiment_win_rate.index, sentiment_win_rate.values, 
-                       color=['red', 'gray', 'green'])
-        axes[0, 1].set_title('Average Win Rate by Sentiment')
-        axes[0, 1].set_ylabel('Win Rate')
-        axes[0, 1].set_xlabel('Sentiment')
-        
-        # Number of trades
-        sentiment_trades = daily_metrics.groupby('sentiment_group')['num_trades'].mean()
-        axes[1, 0].bar(sentiment_trades.index, sentiment_trades.values,
-                       color=['red', 'gray', 'green'])
-        axes[1, 0].set_title('Average Number of Trades by Sentiment')
-        axes[1, 0].set_ylabel('Number of Trades')
-        axes[1, 0].set_xlabel('Sentiment')
-        
-        # Cumulative PnL over time
-        sentiment_timeline = daily_metrics.groupby(['date', 'sentiment_group'])['daily_pnl'].sum().reset_index()
-        sentiment_timeline = sentiment_timeline.pivot(index='date', columns='sentiment_group', values='daily_pnl').fillna(0)
-        sentiment_timeline_cumsum = sentiment_timeline.cumsum()
-        
-        for col in sentiment_timeline_cumsum.columns:
-            axes[1, 1].plot(sentiment_timeline_cumsum.index, sentiment_timeline_cumsum[col], 
-                           label=col, linewidth=2)
-        axes[1, 1].set_title('Cumulative PnL Over Time')
-        axes[1, 1].set_xlabel('Date')
-        axes[1, 1].set_ylabel('Cumulative PnL (USD)')
-        axes[1, 1].legend()
-        axes[1, 1].grid(True, alpha=0.3)
-        
-        plt.tight_layout()
-        st.pyplot(fig)
+        with stage('performance.plot'):
+            st.image(render_cached(('Performance Analysis', dataset_version, filters), 'performance_figure', daily_metrics))
         
         st.markdown("---")
         st.subheader("💡 Key Insights")
         
-        fear_pnl = daily_metrics[daily_metrics['sentiment_group'] == 'Fear']['daily_pnl'].mean()
-        greed_pnl = daily_metrics[daily_metrics['sentiment_group'] == 'Greed']['daily_pnl'].mean()
+        fear_days = daily_metrics[daily_metrics['sentiment_group'] == 'Fear']['daily_pnl']
+        greed_days = daily_metrics[daily_metrics['sentiment_group'] == 'Greed']['daily_pnl']
+        fear_pnl = fear_days.mean()
+        greed_pnl = greed_days.mean()
         
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -303,56 +352,62 @@ if trades_merged is not None:
         with col3:
             diff = ((greed_pnl - fear_pnl) / abs(fear_pnl) * 100) if fear_pnl != 0 else 0
             st.metric("Difference", f"{diff:.1f}%")
+        
+        with stage('performance.significance'):
+            pnl_test = compare(fear_days.values, greed_days.values)
+        st.caption(significance_caption(pnl_test, "Greed − Fear avg daily PnL"))
+        
+        st.markdown("---")
+        st.subheader("📉 Drawdown & Risk by Sentiment")
+        
+        # Each trader's Fear, Neutral and Greed days taken as separate PnL paths
+        with stage('performance.risk'):
+            account_risk, sentiment_risk = tables['risk']
+            risk_comparison = sentiment_risk.groupby('sentiment_group').agg({
+                'max_drawdown': ['mean', 'median'],
+                'max_drawdown_duration': 'median',
+                'sharpe': 'median',
+                'sortino': 'median'
+            }).round(2)
+        
+        st.dataframe(risk_comparison)
+        st.caption("Drawdown duration counts a regime's own days since its last peak; per trader it is in calendar days.")
+        
+        with st.expander("Risk metrics per trader"):
+            st.dataframe(account_risk.sort_values('max_drawdown').round(2))
     
     # BEHAVIORAL ANALYSIS PAGE
     elif page == "Behavioral Analysis":
         st.header("🎯 Behavioral Analysis")
+        daily_metrics = tables['daily_metrics']
         
-        behavior_comparison = daily_metrics.groupby('sentiment_group').agg({
-            'num_trades': ['mean', 'std'],
-            'leverage_proxy': ['mean', 'std'],
-            'long_ratio': 'mean',
-            'avg_trade_size': ['mean', 'std']
-        }).round(3)
+        with stage('behavior.aggregate'):
+            behavior_comparison = daily_metrics.groupby('sentiment_group').agg({
+                'num_trades': ['mean', 'std'],
+                'leverage_proxy': ['mean', 'std'],
+                'long_ratio': 'mean',
+                'avg_trade_size': ['mean', 'std']
+            }).round(3)
         
         st.subheader("Behavioral Metrics by Sentiment")
         st.dataframe(behavior_comparison)
         
         st.markdown("---")
         
-        fig, axes = plt.subplots(2, 2, figsize=(15, 10))
-        
-        # Trade frequency
-        daily_metrics.boxplot(column='num_trades', by='sentiment_group', ax=axes[0, 0])
-        axes[0, 0].set_title('Trade Frequency by Sentiment')
-        axes[0, 0].set_ylabel('Number of Trades per Day')
-        plt.sca(axes[0, 0])
-        plt.xticks(rotation=0)
-        
-        # Leverage
-        daily_metrics.boxplot(column='leverage_proxy', by='sentiment_group', ax=axes[0, 1])
-        axes[0, 1].set_title('Leverage Usage by Sentiment')
-        axes[0, 1].set_ylabel('Leverage Proxy')
-        plt.sca(axes[0, 1])
-        plt.xticks(rotation=0)
-        
-        # Long/Short ratio
-        long_short_data = daily_metrics.groupby('sentiment_group')[['long_ratio', 'short_ratio']].mean()
-        long_short_data.plot(kind='bar', stacked=True, ax=axes[1, 0])
-        axes[1, 0].set_title('Long/Short Ratio by Sentiment')
-        axes[1, 0].set_ylabel('Ratio')
-        axes[1, 0].legend(['Long', 'Short'])
-        axes[1, 0].set_xticklabels(axes[1, 0].get_xticklabels(), rotation=0)
-        
-        # Position size
-        daily_metrics.boxplot(column='avg_trade_size', by='sentiment_group', ax=axes[1, 1])
-        axes[1, 1].set_title('Average Trade Size by Sentiment')
-        axes[1, 1].set_ylabel('Trade Size (USD)')
-        plt.sca(axes[1, 1])
-        plt.xticks(rotation=0)
-        
-        plt.tight_layout()
-        st.pyplot(fig)
+        with stage('behavior.plot'):
+            st.image(render_cached(('Behavioral Analysis', dataset_version, filters), 'behavior_figure', daily_metrics))
+        
+        st.markdown("---")
+        st.subheader("Position Metrics by Sentiment")
+        st.caption("From positions reconstructed fill by fill; notional is marked at the last fill price.")
+        with stage('behavior.positions'):
+            position_comparison = tables['positions'].groupby('sentiment_group').agg({
+                'max_concurrent_notional': ['mean', 'median'],
+                'open_positions': 'mean',
+                'positions_closed': 'mean',
+                'avg_holding_hours': ['mean', 'median']
+            }).round(2)
+        st.dataframe(position_comparison)
         
         st.markdown("---")
         st.subheader("📈 Behavioral Changes")
@@ -370,42 +425,35 @@ if trades_merged is not None:
             st.metric("Trade Frequency Change (Fear → Greed)", f"{trade_change:+.1f}%")
         with col2:
             st.metric("Leverage Change (Fear → Greed)", f"{lev_change:+.1f}%")
+        
+        st.markdown("---")
+        st.subheader("🕒 Coin and Hour Breakdown")
+        st.caption("Summed from the precomputed trade cube; follows the date range and coin filters.")
+        
+        dimension = st.selectbox("Break down by", ["Coin", "hour", "leverage_segment",
+                                                   "frequency_segment", "consistency_segment"])
+        with stage('behavior.cube_rollup'):
+            breakdown = rollup(tables['cube'], [dimension, 'sentiment_group'],
+                               date=(filters.start, filters.end), Coin=filters.coins)
+            if dimension == "Coin":
+                # Keep the most traded coins readable
+                top_coins = breakdown['trades'].groupby(level='Coin').sum().nlargest(15).index
+                breakdown = breakdown[breakdown.index.get_level_values('Coin').isin(top_coins)]
+        
+        st.bar_chart(breakdown['trades'].unstack('sentiment_group'))
+        st.dataframe(breakdown[['trades', 'volume', 'pnl', 'avg_trade_size', 'long_ratio', 'win_rate']].round(3))
     
     # TRADER SEGMENTS PAGE
     elif page == "Trader Segments":
         st.header("👥 Trader Segmentation")
         
-        # Calculate trader stats
-        trader_stats = daily_metrics.groupby('Account').agg({
-            'daily_pnl': ['mean', 'std', 'sum'],
-            'num_trades': 'mean',
-            'leverage_proxy': 'mean',
-            'win_rate': 'mean'
-        }).reset_index()
-        
-        trader_stats.columns = ['Account', 'avg_daily_pnl', 'pnl_volatility', 'total_pnl', 
-                                'avg_trades_per_day', 'avg_leverage', 'avg_win_rate']
-        
-        # Create segments
-        leverage_median = trader_stats['avg_leverage'].median()
-        trader_stats['leverage_segment'] = trader_stats['avg_leverage'].apply(
-            lambda x: 'High Leverage' if x > leverage_median else 'Low Leverage'
-        )
-        
-        trades_median = trader_stats['avg_trades_per_day'].median()
-        trader_stats['frequency_segment'] = trader_stats['avg_trades_per_day'].apply(
-            lambda x: 'Frequent' if x > trades_median else 'Infrequent'
-        )
-        
-        trader_stats['consistency_score'] = trader_stats['avg_daily_pnl'] / (trader_stats['pnl_volatility'] + 1)
-        consistency_median = trader_stats['consistency_score'].median()
-        trader_stats['consistency_segment'] = trader_stats['consistency_score'].apply(
-            lambda x: 'Consistent Winner' if x > consistency_median else 'Inconsistent'
-        )
+        # Trader stats and segments (cached per dataset)
+        with stage('segments.aggregate'):
+            trader_stats, _ = tables['segments']
         
         st.subheader("Segment Distribution")
         
-        col1, col2, col3 = st.columns(3)
+        col1, col2, col3, col4 = st.columns(4)
         
         with col1:
             st.write("**Leverage Segments**")
@@ -419,12 +467,16 @@ if trades_merged is not None:
             st.write("**Consistency Segments**")
             st.write(trader_stats['consistency_segment'].value_counts())
         
+        with col4:
+            st.write("**Clusters**")
+            st.write(trader_stats['cluster_segment'].value_counts())
+        
         st.markdown("---")
         
         # Segment performance
         st.subheader("Segment Performance Comparison")
         
-        tab1, tab2, tab3 = st.tabs(["Leverage", "Frequency", "Consistency"])
+        tab1, tab2, tab3, tab4 = st.tabs(["Leverage", "Frequency", "Consistency", "Clusters"])
         
         with tab1:
             leverage_perf = trader_stats.groupby('leverage_segment').agg({
@@ -450,74 +502,60 @@ if trades_merged is not None:
             }).round(2)
             st.dataframe(consistency_perf)
         
+        with tab4:
+            st.caption("Mini-batch k-means on leverage, frequency, win rate, PnL volatility and "
+                       "sentiment sensitivity (Greed minus Fear average daily PnL).")
+            cluster_perf = trader_stats.groupby('cluster_segment', observed=True).agg({
+                'total_pnl': 'mean',
+                'avg_win_rate': 'mean',
+                'pnl_volatility': 'mean',
+                'avg_leverage': 'mean',
+                'avg_trades_per_day': 'mean'
+            }).round(2)
+            st.dataframe(cluster_perf)
+        
         st.markdown("---")
         
         # Visualization
-        fig, axes = plt.subplots(1, 3, figsize=(15, 5))
-        
-        trader_stats.boxplot(column='total_pnl', by='leverage_segment', ax=axes[0])
-        axes[0].set_title('Total PnL by Leverage')
-        axes[0].set_ylabel('Total PnL (USD)')
-        
-        trader_stats.boxplot(column='total_pnl', by='frequency_segment', ax=axes[1])
-        axes[1].set_title('Total PnL by Frequency')
-        axes[1].set_ylabel('Total PnL (USD)')
-        
-        trader_stats.boxplot(column='total_pnl', by='consistency_segment', ax=axes[2])
-        axes[2].set_title('Total PnL by Consistency')
-        axes[2].set_ylabel('Total PnL (USD)')
-        
-        plt.tight_layout()
-        st.pyplot(fig)
+        with stage('segments.plot'):
+            st.image(render_cached(('Trader Segments', dataset_version, filters), 'segments_figure', trader_stats))
     
     # STRATEGY RECOMMENDATIONS PAGE
     elif page == "Strategy Recommendations":
         st.header("💡 Actionable Strategy Recommendations")
-        
-        # Calculate metrics for strategies
-        trader_stats = daily_metrics.groupby('Account').agg({
-            'daily_pnl': ['mean', 'std'],
-            'num_trades': 'mean',
-            'leverage_proxy': 'mean'
-        }).reset_index()
-        
-        trader_stats.columns = ['Account', 'avg_daily_pnl', 'pnl_volatility', 
-                                'avg_trades_per_day', 'avg_leverage']
-        
-        leverage_median = trader_stats['avg_leverage'].median()
-        trader_stats['leverage_segment'] = trader_stats['avg_leverage'].apply(
-            lambda x: 'High Leverage' if x > leverage_median else 'Low Leverage'
-        )
-        
-        trades_median = trader_stats['avg_trades_per_day'].median()
-        trader_stats['frequency_segment'] = trader_stats['avg_trades_per_day'].apply(
-            lambda x: 'Frequent' if x > trades_median else 'Infrequent'
-        )
-        
-        daily_metrics_with_segments = daily_metrics.merge(
-            trader_stats[['Account', 'leverage_segment', 'frequency_segment']], 
-            on='Account', how='left'
-        )
-        
-        high_lev_fear = daily_metrics_with_segments[
-            (daily_metrics_with_segments['leverage_segment'] == 'High Leverage') & 
-            (daily_metrics_with_segments['sentiment_group'] == 'Fear')
-        ]['daily_pnl'].mean()
-        
-        high_lev_greed = daily_metrics_with_segments[
-            (daily_metrics_with_segments['leverage_segment'] == 'High Leverage') & 
-            (daily_metrics_with_segments['sentiment_group'] == 'Greed')
-        ]['daily_pnl'].mean()
-        
-        freq_fear = daily_metrics_with_segments[
-            (daily_metrics_with_segments['frequency_segment'] == 'Frequent') & 
-            (daily_metrics_with_segments['sentiment_group'] == 'Fear')
-        ]['daily_pnl'].mean()
-        
-        infreq_fear = daily_metrics_with_segments[
-            (daily_metrics_with_segments['frequency_segment'] == 'Infrequent') & 
-            (daily_metrics_with_segments['sentiment_group'] == 'Fear')
-        ]['daily_pnl'].mean()
+        daily_metrics = tables['daily_metrics']
+        
+        # Segments joined onto daily metrics (cached per dataset)
+        with stage('strategy.aggregate'):
+            _, daily_metrics_with_segments = tables['segments']
+        
+            high_lev_fear_days = daily_metrics_with_segments[
+                (daily_metrics_with_segments['leverage_segment'] == 'High Leverage') & 
+                (daily_metrics_with_segments['sentiment_group'] == 'Fear')
+            ]['daily_pnl']
+            high_lev_fear = high_lev_fear_days.mean()
+        
+            high_lev_greed_days = daily_metrics_with_segments[
+                (daily_metrics_with_segments['leverage_segment'] == 'High Leverage') & 
+                (daily_metrics_with_segments['sentiment_group'] == 'Greed')
+            ]['daily_pnl']
+            high_lev_greed = high_lev_greed_days.mean()
+        
+            freq_fear_days = daily_metrics_with_segments[
+                (daily_metrics_with_segments['frequency_segment'] == 'Frequent') & 
+                (daily_metrics_with_segments['sentiment_group'] == 'Fear')
+            ]['daily_pnl']
+            freq_fear = freq_fear_days.mean()
+        
+            infreq_fear_days = daily_metrics_with_segments[
+                (daily_metrics_with_segments['frequency_segment'] == 'Infrequent') & 
+                (daily_metrics_with_segments['sentiment_group'] == 'Fear')
+            ]['daily_pnl']
+            infreq_fear = infreq_fear_days.mean()
+        
+        with stage('strategy.significance'):
+            leverage_test = compare(high_lev_greed_days.values, high_lev_fear_days.values)
+            frequency_test = compare(infreq_fear_days.values, freq_fear_days.values)
         
         st.subheader("🎯 Strategy 1: Dynamic Leverage Management")
         
@@ -534,9 +572,14 @@ if trades_merged is not None:
         with col2:
             st.metric("High Leverage PnL (Greed)", f"${high_lev_greed:.2f}")
         
-        if high_lev_fear < high_lev_greed:
+        st.caption(significance_caption(leverage_test, "Fear − Greed (high leverage)"))
+        
+        # Recommend only when the gap is unlikely to be resampling noise
+        if high_lev_fear < high_lev_greed and leverage_test.p_value < 0.05:
             st.success("✅ Recommendation: Reduce leverage during Fear periods")
             st.write(f"Expected Impact: 25-35% reduction in drawdowns")
+        elif high_lev_fear < high_lev_greed:
+            st.info("High-leverage traders do worse in Fear, but the gap is not statistically significant (p ≥ 0.05)")
         
         st.markdown("---")
         
@@ -555,9 +598,47 @@ if trades_merged is not None:
         with col2:
             st.metric("Infrequent Traders PnL (Fear)", f"${infreq_fear:.2f}")
         
-        if freq_fear < infreq_fear:
+        st.caption(significance_caption(frequency_test, "Frequent − Infrequent (Fear)"))
+        
+        if freq_fear < infreq_fear and frequency_test.p_value < 0.05:
             st.success("✅ Recommendation: Reduce trade frequency during Fear periods")
             st.write(f"Expected Impact: 15-25% improvement in net returns")
+        elif freq_fear < infreq_fear:
+            st.info("Frequent traders do worse in Fear, but the gap is not statistically significant (p ≥ 0.05)")
+        
+        st.markdown("---")
+        
+        st.subheader("📈 3-Day Sentiment Signal")
+        
+        latest = daily_metrics.loc[daily_metrics['date'].idxmax()]
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("3-Day Avg Index", f"{latest['fg_ma3']:.1f}",
+                      f"{latest['fg_ma3'] - latest['fg_ma3_lag1']:+.1f} vs yesterday")
+        with col2:
+            st.metric("Current Band", str(latest['fg_band']))
+        with col3:
+            st.metric("Days in Band", f"{latest['regime_days']}")
+        
+        with stage('strategy.signal'):
+            band_perf = daily_metrics.groupby('fg_band', observed=True).agg({
+                'daily_pnl': 'mean',
+                'win_rate': 'mean',
+                'num_trades': 'mean',
+                'leverage_proxy': 'mean'
+            }).round(3)
+            # Performance by how long the band has lasted
+            regime_length = pd.cut(daily_metrics['regime_days'], [0, 3, 7, 30, np.inf],
+                                   labels=['1-3 days', '4-7 days', '8-30 days', '30+ days'])
+            regime_perf = daily_metrics.groupby(['fg_band', regime_length], observed=True)['daily_pnl'].mean().unstack().round(2)
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write("**Performance by 3-day average band** (Fear < 30, Greed > 70)")
+            st.dataframe(band_perf)
+        with col2:
+            st.write("**Avg daily PnL by band and regime length**")
+            st.dataframe(regime_perf)
         
         st.markdown("---")
         
@@ -588,3 +669,19 @@ if trades_merged is not None:
 else:
     st.error("Failed to load data. Please ensure 'fear_greed_index.csv' and 'historical_data.csv' are in the same directory.")
     st.info("Run the analysis notebook first to ensure data is properly formatted.")
+
+# Pipeline timings panel
+activate(None)
+profiler.write_log(f"{PROFILE_DIR}/pipeline_profile.jsonl")
+with st.sidebar.expander("⏱ Pipeline timings"):
+    timings = profiler.table()
+    st.write(f"Total: {profiler.total_seconds():.3f}s")
+    charts = figure_cache()
+    st.write(f"Chart cache: {charts.hits} hits, {charts.misses} misses, {charts.size / 1024 ** 2:.1f} MB")
+    st.dataframe(timings)
+    st.download_button("Download JSON", profiler.to_json(), file_name="pipeline_profile.json")
+    if cprofile is not None:
+        cprofile.disable()
+        profile_path, profile_summary = dump_cprofile(cprofile, PROFILE_DIR)
+        st.write(f"cProfile dump: `{profile_path}`")
+        st.text(profile_summary)
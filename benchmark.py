@@ -0,0 +1,178 @@
+"""
+Headless benchmark for the load/process pipeline
+
+Generates synthetic historical_data.csv files with the real trade schema,
+runs each pipeline stage on its own and records wall time and peak traced
+memory per stage into a JSON report.
+
+Usage: python benchmark.py [--rows 10000 1000000] [--accounts 50 500] [--workers N]
+                           [--no-memory] [--output benchmark_report.json]
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from loader import FEAR_GREED_PATH, TIMESTAMP_FORMAT, join_sentiment, read_fear_greed, read_trades
+from metrics import build_daily_metrics, compute_leverage
+from parallel import parallel_daily_metrics
+from positions import position_metrics
+from segments import attach_segments, build_trader_stats
+from streaming import stream_daily_metrics
+
+COINS = ['BTC', 'ETH', 'SOL', 'HYPE', 'DOGE', 'SUI', '@107', 'kPEPE']
+DIRECTIONS = {
+    'BUY': np.array(['Open Long', 'Close Short', 'Buy']),
+    'SELL': np.array(['Open Short', 'Close Long', 'Sell'])
+}
+
+GENERATE_CHUNK = 1_000_000
+
+
+def generate_trades(path, rows, accounts=50, start='2023-05-01', days=700, seed=0):
+    """Write a synthetic trades CSV with the same columns and formats as historical_data.csv."""
+    rng = np.random.default_rng(seed)
+    account_ids = np.array(['0x' + ''.join(rng.choice(list('0123456789abcdef'), 40)) for _ in range(accounts)])
+    # Skewed activity: a few accounts produce most fills, as in the real export
+    weights = rng.pareto(1.5, accounts) + 1
+    weights /= weights.sum()
+    start = pd.Timestamp(start)
+
+    written = 0
+    while written < rows:
+        n = min(GENERATE_CHUNK, rows - written)
+        side = rng.choice(['BUY', 'SELL'], n)
+        closing = rng.random(n) < 0.45
+        timestamps = start + pd.to_timedelta(rng.integers(0, days * 24 * 60, n), unit='m')
+        size_usd = np.round(rng.lognormal(6, 1.6, n), 2)
+        price = np.round(rng.lognormal(4, 2, n), 4)
+        direction = rng.integers(0, 3, n)
+        hashes = rng.bytes(32 * n).hex()
+        chunk = pd.DataFrame({
+            'Account': account_ids[rng.choice(accounts, n, p=weights)],
+            'Coin': rng.choice(COINS, n),
+            'Execution Price': price,
+            'Size Tokens': np.round(size_usd / price, 4),
+            'Size USD': size_usd,
+            'Side': side,
+            'Timestamp IST': timestamps.strftime(TIMESTAMP_FORMAT),
+            'Start Position': np.round(rng.normal(0, 1000, n), 4),
+            'Direction': np.where(side == 'BUY', DIRECTIONS['BUY'][direction], DIRECTIONS['SELL'][direction]),
+            'Closed PnL': np.where(closing, np.round(rng.normal(5, 200, n), 6), 0.0),
+            'Transaction Hash': ['0x' + hashes[i:i + 64] for i in range(0, 64 * n, 64)],
+            'Order ID': rng.integers(10 ** 10, 10 ** 11, n),
+            'Crossed': rng.random(n) < 0.6,
+            'Fee': np.round(size_usd * 0.00035, 6),
+            'Trade ID': rng.integers(10 ** 14, 10 ** 15, n),
+            # Epoch milliseconds, whatever the datetime resolution
+            'Timestamp': (timestamps - pd.Timedelta(hours=5, minutes=30) - pd.Timestamp(0)) // pd.Timedelta('1ms')
+        })
+        chunk.to_csv(path, mode='a' if written else 'w', header=not written, index=False)
+        written += n
+    return path
+
+
+def measure(stage, func, *args, trace_memory=True):
+    """
+    Run func, returning (result, record with wall seconds and peak traced MB).
+
+    tracemalloc slows allocation-heavy code considerably, so the stage is timed
+    untraced and then run a second time under tracing for its memory peak.
+    """
+    started = time.perf_counter()
+    result = func(*args)
+    record = {'stage': stage, 'seconds': round(time.perf_counter() - started, 4), 'peak_mb': None}
+
+    if trace_memory:
+        tracemalloc.start()
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        record['peak_mb'] = round(peak / 1024 ** 2, 2)
+    return result, record
+
+
+def run_pipeline(trades_path, fear_greed_path=FEAR_GREED_PATH, trace_memory=True, workers=None):
+    """
+    Time every pipeline stage independently on one trades file.
+    parallel_daily_metrics runs on `workers` processes; its traced peak
+    covers only the parent process.
+    """
+    records = []
+
+    def stage(name, func, *args):
+        result, record = measure(name, func, *args, trace_memory=trace_memory)
+        records.append(record)
+        return result
+
+    fear_greed = stage('read_fear_greed', read_fear_greed, fear_greed_path)
+    trades = stage('read_trades', read_trades, trades_path)
+    trades_merged = stage('join_sentiment', join_sentiment, trades, fear_greed)
+    stage('compute_leverage', compute_leverage, trades_merged)
+    daily_metrics = stage('build_daily_metrics', build_daily_metrics, trades_merged)
+    stage('parallel_daily_metrics', parallel_daily_metrics, trades_merged, workers)
+    stage('position_metrics', position_metrics, trades_merged)
+    trader_stats = stage('build_trader_stats', build_trader_stats, daily_metrics)
+    stage('attach_segments', attach_segments, daily_metrics, trader_stats)
+    stage('stream_daily_metrics', stream_daily_metrics, trades_path, fear_greed_path)
+    return records
+
+
+def run_benchmarks(scales, account_counts, fear_greed_path=FEAR_GREED_PATH, data_dir=None, trace_memory=True,
+                   workers=None):
+    """
+    Generate one trades file per (rows, accounts) pair of `scales` x
+    `account_counts`, run the pipeline on it and return the report.
+    """
+    workdir = data_dir or tempfile.mkdtemp(prefix='trades-bench-')
+    report = {
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'cpu_count': os.cpu_count(),
+        'runs': []
+    }
+    try:
+        for rows, accounts in itertools.product(scales, account_counts):
+            trades_path = os.path.join(workdir, f"historical_data_{rows}_{accounts}.csv")
+            if not os.path.exists(trades_path):
+                generate_trades(trades_path, rows, accounts=accounts)
+            for record in run_pipeline(trades_path, fear_greed_path, trace_memory, workers):
+                record.update(rows=rows, accounts=accounts)
+                report['runs'].append(record)
+                peak = f"{record['peak_mb']:>10.1f} MB" if record['peak_mb'] is not None else ''
+                print(f"{rows:>12,} rows {accounts:>7,} accts  {record['stage']:<22} "
+                      f"{record['seconds']:>9.3f}s {peak}")
+    finally:
+        if data_dir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the trade processing pipeline on synthetic data')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help='Trade counts to benchmark (e.g. 10000 1000000 50000000)')
+    parser.add_argument('--accounts', type=int, nargs='+', default=[50],
+                        help='Synthetic account counts to benchmark at every row count (e.g. 50 500 5000)')
+    parser.add_argument('--fear-greed', default=FEAR_GREED_PATH, help='Fear & Greed index CSV')
+    parser.add_argument('--data-dir', help='Keep generated CSVs here (reused on later runs)')
+    parser.add_argument('--workers', type=int, help='Processes for parallel_daily_metrics (default: all cores)')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the traced run for peak memory')
+    parser.add_argument('--output', default='benchmark_report.json', help='JSON report path')
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.rows, args.accounts, args.fear_greed, args.data_dir,
+                            trace_memory=not args.no_memory, workers=args.workers)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
@@ -0,0 +1,73 @@
+"""
+Pre-computed box-plot statistics
+
+Quartiles, whiskers and a capped outlier sample per group are computed in
+one vectorized pass and drawn with Axes.bxp, so rendering cost does not
+depend on the number of rows behind each box. Groups larger than
+`exact_limit` rows get their quartiles from a uniform sample.
+"""
+
+import numpy as np
+import pandas as pd
+
+WHISKER_RANGE = 1.5
+MAX_OUTLIERS = 200
+EXACT_LIMIT = 1_000_000
+
+
+def box_stats(frame, column, by, max_outliers=MAX_OUTLIERS, exact_limit=EXACT_LIMIT, seed=0):
+    """
+    Per-group statistics in the format Axes.bxp expects, one dict per group in
+    sorted group order (matching DataFrame.boxplot(by=...)).
+    """
+    data = frame[[by, column]].dropna()
+    groups = data[by].astype(str)
+    values = data[column].astype('float64')
+    rng = np.random.default_rng(seed)
+
+    # Quartiles, on a uniform sample of each oversized group
+    sizes = groups.map(groups.value_counts())
+    keep = rng.random(len(values)) < (exact_limit / sizes).clip(upper=1).values
+    quartiles = values[keep].groupby(groups[keep]).quantile([0.25, 0.5, 0.75]).unstack()
+    quartiles.columns = ['q1', 'med', 'q3']
+
+    iqr = quartiles['q3'] - quartiles['q1']
+    lower_fence = (quartiles['q1'] - WHISKER_RANGE * iqr).reindex(groups).values
+    upper_fence = (quartiles['q3'] + WHISKER_RANGE * iqr).reindex(groups).values
+
+    # Whiskers reach the most extreme values inside the fences
+    inside = (values.values >= lower_fence) & (values.values <= upper_fence)
+    whiskers = values[inside].groupby(groups[inside]).agg(['min', 'max'])
+
+    # Outliers: always the extremes, plus a random sample up to the cap
+    outliers = values[~inside]
+    outlier_groups = groups[~inside]
+    shuffled = outliers.sample(frac=1, random_state=seed)
+    sampled = shuffled.groupby(outlier_groups.reindex(shuffled.index)).head(max_outliers)
+    extremes = outliers.groupby(outlier_groups).agg(['min', 'max'])
+
+    stats = []
+    for label, row in quartiles.iterrows():
+        fliers = sampled[outlier_groups.reindex(sampled.index) == label].values
+        if label in extremes.index:
+            fliers = np.concatenate([fliers, extremes.loc[label].values])
+        whisker = whiskers.loc[label] if label in whiskers.index else pd.Series({'min': row['q1'], 'max': row['q3']})
+        stats.append({
+            'label': label,
+            'q1': row['q1'],
+            'med': row['med'],
+            'q3': row['q3'],
+            'whislo': whisker['min'],
+            'whishi': whisker['max'],
+            'fliers': fliers
+        })
+    return stats
+
+
+def draw_boxplot(ax, frame, column, by):
+    """Drop-in for frame.boxplot(column=column, by=by, ax=ax) drawn from box_stats."""
+    stats = box_stats(frame, column, by)
+    ax.bxp(stats)
+    ax.set_xlabel(by)
+    ax.grid(True)
+    return stats
@@ -0,0 +1,188 @@
+"""
+Dashboard and report charts
+
+Each function builds one page's matplotlib figure from the derived tables and
+returns it without displaying it, so callers can render it to PNG bytes. Box
+plots are drawn from pre-computed group statistics (see box_stats.py).
+"""
+
+import matplotlib.pyplot as plt
+
+from box_stats import draw_boxplot
+
+
+def overview_figure(daily_metrics):
+    """Sentiment distribution of trader-days (Overview page)."""
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
+
+    # Sentiment counts
+    sentiment_counts = daily_metrics['sentiment'].value_counts()
+    ax1.bar(sentiment_counts.index, sentiment_counts.values, color=['red', 'orange', 'gray', 'lightgreen', 'green'])
+    ax1.set_title('Trading Days by Sentiment', fontsize=14, fontweight='bold')
+    ax1.set_xlabel('Sentiment')
+    ax1.set_ylabel('Number of Days')
+    ax1.tick_params(axis='x', rotation=45)
+
+    # Fear/Greed groups
+    group_counts = daily_metrics['sentiment_group'].value_counts()
+    colors = {'Fear': 'red', 'Neutral': 'gray', 'Greed': 'green'}
+    ax2.pie(group_counts.values, labels=group_counts.index, autopct='%1.1f%%',
+            colors=[colors[x] for x in group_counts.index], startangle=90)
+    ax2.set_title('Sentiment Group Distribution', fontsize=14, fontweight='bold')
+
+    plt.tight_layout()
+    return fig
+
+
+def performance_figure(daily_metrics):
+    """PnL, win rate, trade count and cumulative PnL by sentiment (Performance page)."""
+    fig, axes = plt.subplots(2, 2, figsize=(15, 10))
+
+    # PnL by sentiment
+    draw_boxplot(axes[0, 0], daily_metrics, 'daily_pnl', 'sentiment_group')
+    axes[0, 0].set_title('Daily PnL Distribution by Sentiment')
+    axes[0, 0].set_xlabel('Sentiment')
+    axes[0, 0].set_ylabel('Daily PnL (USD)')
+    plt.sca(axes[0, 0])
+    plt.xticks(rotation=0)
+
+    # Win rate
+    sentiment_win_rate = daily_metrics.groupby('sentiment_group')['win_rate'].mean()
+    axes[0, 1].bar(sentiment_win_rate.index, sentiment_win_rate.values,
+                   color=['red', 'gray', 'green'])
+    axes[0, 1].set_title('Average Win Rate by Sentiment')
+    axes[0, 1].set_ylabel('Win Rate')
+    axes[0, 1].set_xlabel('Sentiment')
+
+    # Number of trades
+    sentiment_trades = daily_metrics.groupby('sentiment_group')['num_trades'].mean()
+    axes[1, 0].bar(sentiment_trades.index, sentiment_trades.values,
+                   color=['red', 'gray', 'green'])
+    axes[1, 0].set_title('Average Number of Trades by Sentiment')
+    axes[1, 0].set_ylabel('Number of Trades')
+    axes[1, 0].set_xlabel('Sentiment')
+
+    # Cumulative PnL over time
+    sentiment_timeline = daily_metrics.groupby(['date', 'sentiment_group'])['daily_pnl'].sum().reset_index()
+    sentiment_timeline = sentiment_timeline.pivot(index='date', columns='sentiment_group', values='daily_pnl').fillna(0)
+    sentiment_timeline_cumsum = sentiment_timeline.cumsum()
+
+    for col in sentiment_timeline_cumsum.columns:
+        axes[1, 1].plot(sentiment_timeline_cumsum.index, sentiment_timeline_cumsum[col],
+                       label=col, linewidth=2)
+    axes[1, 1].set_title('Cumulative PnL Over Time')
+    axes[1, 1].set_xlabel('Date')
+    axes[1, 1].set_ylabel('Cumulative PnL (USD)')
+    axes[1, 1].legend()
+    axes[1, 1].grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    return fig
+
+
+def behavior_figure(daily_metrics):
+    """Frequency, leverage, long/short ratio and trade size by sentiment (Behavioral page)."""
+    fig, axes = plt.subplots(2, 2, figsize=(15, 10))
+
+    # Trade frequency
+    draw_boxplot(axes[0, 0], daily_metrics, 'num_trades', 'sentiment_group')
+    axes[0, 0].set_title('Trade Frequency by Sentiment')
+    axes[0, 0].set_ylabel('Number of Trades per Day')
+    plt.sca(axes[0, 0])
+    plt.xticks(rotation=0)
+
+    # Leverage
+    draw_boxplot(axes[0, 1], daily_metrics, 'leverage_proxy', 'sentiment_group')
+    axes[0, 1].set_title('Leverage Usage by Sentiment')
+    axes[0, 1].set_ylabel('Leverage Proxy')
+    plt.sca(axes[0, 1])
+    plt.xticks(rotation=0)
+
+    # Long/Short ratio
+    long_short_data = daily_metrics.groupby('sentiment_group')[['long_ratio', 'short_ratio']].mean()
+    long_short_data.plot(kind='bar', stacked=True, ax=axes[1, 0])
+    axes[1, 0].set_title('Long/Short Ratio by Sentiment')
+    axes[1, 0].set_ylabel('Ratio')
+    axes[1, 0].legend(['Long', 'Short'])
+    axes[1, 0].set_xticklabels(axes[1, 0].get_xticklabels(), rotation=0)
+
+    # Position size
+    draw_boxplot(axes[1, 1], daily_metrics, 'avg_trade_size', 'sentiment_group')
+    axes[1, 1].set_title('Average Trade Size by Sentiment')
+    axes[1, 1].set_ylabel('Trade Size (USD)')
+    plt.sca(axes[1, 1])
+    plt.xticks(rotation=0)
+
+    plt.tight_layout()
+    return fig
+
+
+def segments_figure(trader_stats):
+    """Total PnL by leverage, frequency, consistency and (if assigned) cluster segment (Trader Segments page)."""
+    clustered = 'cluster_segment' in trader_stats
+    fig, axes = plt.subplots(1, 4 if clustered else 3, figsize=(20 if clustered else 15, 5))
+
+    draw_boxplot(axes[0], trader_stats, 'total_pnl', 'leverage_segment')
+    axes[0].set_title('Total PnL by Leverage')
+    axes[0].set_ylabel('Total PnL (USD)')
+
+    draw_boxplot(axes[1], trader_stats, 'total_pnl', 'frequency_segment')
+    axes[1].set_title('Total PnL by Frequency')
+    axes[1].set_ylabel('Total PnL (USD)')
+
+    draw_boxplot(axes[2], trader_stats, 'total_pnl', 'consistency_segment')
+    axes[2].set_title('Total PnL by Consistency')
+    axes[2].set_ylabel('Total PnL (USD)')
+
+    if clustered:
+        draw_boxplot(axes[3], trader_stats, 'total_pnl', 'cluster_segment')
+        axes[3].set_title('Total PnL by Cluster')
+        axes[3].set_ylabel('Total PnL (USD)')
+        axes[3].tick_params(axis='x', labelrotation=20)
+
+    plt.tight_layout()
+    return fig
+
+
+def correlation_figure(daily_metrics):
+    """Correlation of the Fear & Greed index with trading metrics (report)."""
+    import seaborn as sns
+
+    correlation_data = daily_metrics[['fg_value', 'daily_pnl', 'win_rate', 'num_trades', 'leverage_proxy']].corr()
+    fig, ax = plt.subplots(figsize=(10, 8))
+    sns.heatmap(correlation_data, annot=True, cmap='coolwarm', center=0, fmt='.2f', ax=ax)
+    ax.set_title('Correlation: Fear/Greed Index vs Trading Metrics')
+    plt.tight_layout()
+    return fig
+
+
+def cumulative_pnl_figure(daily_metrics):
+    """Cumulative PnL over time by sentiment period (report)."""
+    sentiment_timeline = daily_metrics.groupby(['date', 'sentiment_group'])['daily_pnl'].sum().reset_index()
+    sentiment_timeline = sentiment_timeline.pivot(index='date', columns='sentiment_group', values='daily_pnl').fillna(0)
+    sentiment_timeline_cumsum = sentiment_timeline.cumsum()
+
+    fig, ax = plt.subplots(figsize=(15, 6))
+    for col in sentiment_timeline_cumsum.columns:
+        ax.plot(sentiment_timeline_cumsum.index, sentiment_timeline_cumsum[col], label=col, linewidth=2)
+    ax.set_title('Cumulative PnL Over Time by Sentiment Period')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Cumulative PnL (USD)')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    plt.tight_layout()
+    return fig
+
+
+def segment_sentiment_figure(daily_metrics_with_segments):
+    """Average daily PnL by leverage segment and sentiment (report)."""
+    pivot_data = daily_metrics_with_segments.groupby(['leverage_segment', 'sentiment_group'],
+                                                     observed=True)['daily_pnl'].mean().unstack()
+    fig, ax = plt.subplots(figsize=(10, 6))
+    pivot_data.plot(kind='bar', ax=ax)
+    ax.set_title('Average Daily PnL by Leverage Segment and Sentiment')
+    ax.set_ylabel('Average Daily PnL (USD)')
+    ax.set_xlabel('Leverage Segment')
+    ax.legend(title='Sentiment')
+    plt.tight_layout()
+    return fig
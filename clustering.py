@@ -0,0 +1,203 @@
+"""
+Data-driven trader segments from mini-batch k-means
+
+Accounts are described by a small feature vector (leverage, frequency, win
+rate, PnL volatility and sentiment sensitivity), scaled with log transforms
+for the heavy-tailed features and standardized. Centroids are fitted with
+mini-batch k-means in NumPy and cached on disk together with the accounts
+they were fitted on; later runs assign accounts to the cached centroids and
+only fold accounts not seen before into them (one mini-batch update), so
+segments stay stable as data is ingested.
+"""
+
+import hashlib
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from disk_cache import CACHE_DIR, CACHE_VERSION, read_cached, write_cached
+
+CLUSTERS = 4
+BATCH_SIZE = 1024
+ITERATIONS = 100
+
+# Bump when the cached model layout or fitting changes
+MODEL_VERSION = 2
+
+# Feature -> transform applied before standardizing
+FEATURES = {
+    'avg_leverage': 'log',
+    'avg_trades_per_day': 'log',
+    'avg_win_rate': None,
+    'pnl_volatility': 'log',
+    'sentiment_sensitivity': 'signed_log'
+}
+
+FEATURE_NAMES = {
+    'avg_leverage': 'leverage',
+    'avg_trades_per_day': 'frequency',
+    'avg_win_rate': 'win rate',
+    'pnl_volatility': 'volatility',
+    'sentiment_sensitivity': 'sentiment sensitivity'
+}
+
+# median: per-feature training medians (after transforms), used for missing values
+KMeansModel = namedtuple('KMeansModel', ['median', 'mean', 'scale', 'centroids', 'counts'])
+
+
+def account_features(daily_metrics, trader_stats):
+    """Raw per-account features, indexed by Account."""
+    features = trader_stats.set_index('Account')[[name for name in FEATURES if name in trader_stats]]
+    # Mean daily PnL on Greed days minus Fear days
+    by_sentiment = daily_metrics.groupby(['Account', 'sentiment_group'], observed=True)['daily_pnl'].mean().unstack()
+    by_sentiment = by_sentiment.reindex(index=features.index, columns=['Fear', 'Greed'])
+    features = features.assign(sentiment_sensitivity=by_sentiment['Greed'] - by_sentiment['Fear'])
+    return features[list(FEATURES)]
+
+
+def _transform(features):
+    values = features.astype('float64').copy()
+    for name, transform in FEATURES.items():
+        if transform == 'log':
+            values[name] = np.log1p(values[name].clip(lower=0))
+        elif transform == 'signed_log':
+            values[name] = np.sign(values[name]) * np.log1p(values[name].abs())
+    return values.values
+
+
+def _impute(values, median):
+    # Accounts missing a feature (e.g. no Fear days) sit at its training median
+    return np.where(np.isnan(values), median, values)
+
+
+def _standardize(features, model):
+    return (_impute(_transform(features), model.median) - model.mean) / model.scale
+
+
+def _nearest(points, centroids):
+    distances = (points ** 2).sum(axis=1)[:, None] - 2 * points @ centroids.T + (centroids ** 2).sum(axis=1)[None, :]
+    return distances.argmin(axis=1)
+
+
+def _update(centroids, counts, batch):
+    """One mini-batch step: each centroid moves towards its points with rate 1 / (points seen)."""
+    labels = _nearest(batch, centroids)
+    sums = np.zeros_like(centroids)
+    np.add.at(sums, labels, batch)
+    batch_counts = np.bincount(labels, minlength=len(centroids))
+    counts = counts + batch_counts
+    hit = batch_counts > 0
+    centroids = centroids.copy()
+    centroids[hit] += (sums[hit] - batch_counts[hit, None] * centroids[hit]) / counts[hit, None]
+    return centroids, counts
+
+
+def fit_kmeans(features, k=CLUSTERS, batch_size=BATCH_SIZE, iterations=ITERATIONS, seed=0):
+    """Mini-batch k-means (k-means++ seeding) on transformed, standardized features."""
+    values = _transform(features)
+    median = pd.DataFrame(values).median().fillna(0).values
+    values = _impute(values, median)
+    mean = values.mean(axis=0)
+    scale = values.std(axis=0)
+    scale[scale == 0] = 1
+    points = (values - mean) / scale
+    k = min(k, len(points))
+    rng = np.random.default_rng(seed)
+
+    # k-means++ seeding
+    centroids = [points[rng.integers(len(points))]]
+    for _ in range(1, k):
+        distances = ((points[:, None, :] - np.array(centroids)[None]) ** 2).sum(axis=2).min(axis=1)
+        total = distances.sum()
+        probabilities = distances / total if total > 0 else None
+        centroids.append(points[rng.choice(len(points), p=probabilities)])
+    centroids = np.array(centroids)
+    counts = np.zeros(k, dtype=np.int64)
+
+    for _ in range(iterations):
+        batch = points[rng.choice(len(points), min(batch_size, len(points)), replace=False)]
+        centroids, counts = _update(centroids, counts, batch)
+    return KMeansModel(median, mean, scale, centroids, counts)
+
+
+def partial_fit(model, features):
+    """Fold new accounts into the centroids with one mini-batch update."""
+    if len(features) == 0:
+        return model
+    points = _standardize(features, model)
+    centroids, counts = _update(model.centroids, model.counts, points)
+    return model._replace(centroids=centroids, counts=counts)
+
+
+def assign_clusters(model, features):
+    """Index of the nearest centroid for each account."""
+    return _nearest(_standardize(features, model), model.centroids)
+
+
+def cluster_labels(model):
+    """Readable name per centroid from its most distinctive feature, e.g. 'C1: high leverage'."""
+    labels = []
+    for i, centroid in enumerate(model.centroids):
+        feature = int(np.abs(centroid).argmax())
+        level = 'high' if centroid[feature] > 0 else 'low'
+        labels.append(f"C{i + 1}: {level} {FEATURE_NAMES[list(FEATURES)[feature]]}")
+    return labels
+
+
+def _model_frame(model, accounts):
+    frame = pd.DataFrame(model.centroids, columns=list(FEATURES))
+    frame['count'] = model.counts
+    frame['kind'] = 'centroid'
+    stats = pd.DataFrame([model.median, model.mean, model.scale], columns=list(FEATURES)).assign(
+        count=0, kind=['median', 'mean', 'scale'])
+    known = pd.DataFrame({'kind': 'account', 'account': list(map(str, accounts))})
+    return pd.concat([frame, stats, known], ignore_index=True)
+
+
+def _frame_model(frame):
+    def row(kind):
+        return frame.loc[frame['kind'] == kind, list(FEATURES)].values[0]
+
+    centroids = frame[frame['kind'] == 'centroid']
+    model = KMeansModel(row('median'), row('mean'), row('scale'), centroids[list(FEATURES)].values,
+                        centroids['count'].values.astype(np.int64))
+    return model, set(frame.loc[frame['kind'] == 'account', 'account'])
+
+
+def _model_key():
+    """Cache key covering the cache and model versions and the feature list with its transforms."""
+    spec = f"v{CACHE_VERSION}.{MODEL_VERSION}|" + '|'.join(f"{name}:{transform}" for name, transform in FEATURES.items())
+    return hashlib.sha1(spec.encode()).hexdigest()[:16]
+
+
+def load_or_fit(features, k=CLUSTERS, cache_dir=CACHE_DIR, refit=False):
+    """
+    Cached model for k clusters, updated with accounts it has not seen;
+    fitted from scratch when there is none (or refit=True).
+    """
+    name, key = f"kmeans_k{k}", _model_key()
+    cached = None if refit else read_cached(name, key, cache_dir)
+    if cached is None:
+        model, known = fit_kmeans(features, k), set()
+    else:
+        model, known = _frame_model(cached)
+    new = ~features.index.astype(str).isin(known)
+    if cached is None or new.any():
+        model = partial_fit(model, features[new]) if cached is not None else model
+        write_cached(name, key, _model_frame(model, known | set(features.index.astype(str))), cache_dir)
+    return model
+
+
+def cluster_segments(daily_metrics, trader_stats, model=None, k=CLUSTERS, cache_dir=CACHE_DIR):
+    """
+    trader_stats with a `cluster_segment` column: each account's nearest
+    centroid of `model`, or of the cached model for these accounts if None.
+    """
+    features = account_features(daily_metrics, trader_stats)
+    if model is None:
+        model = load_or_fit(features, k, cache_dir)
+    labels = cluster_labels(model)
+    clusters = pd.Categorical.from_codes(assign_clusters(model, features), categories=labels)
+    return trader_stats.assign(cluster_segment=pd.Series(clusters, index=features.index)
+                               .reindex(trader_stats['Account']).values)
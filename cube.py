@@ -0,0 +1,77 @@
+"""
+Aggregate cube of trades over (date, hour, Coin, trader segments, sentiment)
+
+Every measure is additive (counts and sums), so any roll-up is a sum over
+cube cells: ratios such as win rate or average trade size are derived only
+after summing. Dimensions are stored as categoricals / small integers and
+counts as int32 to keep the cube compact.
+"""
+
+import numpy as np
+import pandas as pd
+
+from metrics import SENTIMENT_GROUPS
+from segments import SEGMENT_COLUMNS
+
+CUBE_DIMENSIONS = ['date', 'hour', 'Coin'] + SEGMENT_COLUMNS + ['sentiment_group']
+CUBE_MEASURES = ['trades', 'buys', 'volume', 'pnl', 'wins', 'closed_trades']
+
+# sentiment_group of trades on days without a Fear & Greed value
+NO_SENTIMENT = 'No data'
+
+# Bump when the cube layout changes (part of its disk cache key)
+CUBE_VERSION = 2
+
+
+def build_cube(trades_merged, trader_stats):
+    """
+    One row per non-empty cell. Trades without sentiment data are kept under
+    sentiment_group NO_SENTIMENT; trades of accounts missing from
+    trader_stats are dropped.
+    """
+    segments = trader_stats.set_index('Account')[SEGMENT_COLUMNS].reindex(trades_merged['Account'])
+    pnl = trades_merged['Closed PnL']
+    frame = pd.DataFrame({
+        'date': trades_merged['date'].values,
+        'hour': trades_merged['Timestamp IST'].dt.hour.astype('int8').values,
+        'Coin': trades_merged['Coin'].values,
+        'sentiment_group': (trades_merged['sentiment'].map(SENTIMENT_GROUPS).astype(object)
+                            .fillna(NO_SENTIMENT).astype('category').values),
+        'trades': 1,
+        'buys': (trades_merged['Side'] == 'BUY').values,
+        'volume': trades_merged['Size USD'].values,
+        'pnl': pnl.values,
+        'wins': (pnl > 0).values,
+        'closed_trades': (pnl != 0).values
+    })
+    for col in SEGMENT_COLUMNS:
+        frame[col] = segments[col].values
+
+    cube = frame.groupby(CUBE_DIMENSIONS, sort=True, observed=True)[CUBE_MEASURES].sum().reset_index()
+    counts = ['trades', 'buys', 'wins', 'closed_trades']
+    cube[counts] = cube[counts].astype(np.int32)
+    return cube
+
+
+def rollup(cube, by, **selection):
+    """
+    Sum cube cells up to the dimensions in `by`, keeping only cells whose
+    dimension values are in selection[dim] (e.g. Coin=['BTC', 'ETH'],
+    date=(start, end) for an inclusive date range), plus derived ratios.
+    """
+    mask = np.ones(len(cube), dtype=bool)
+    for dim, values in selection.items():
+        if dim == 'date':
+            start, end = values
+            if start is not None:
+                mask &= (cube['date'] >= pd.Timestamp(start)).values
+            if end is not None:
+                mask &= (cube['date'] <= pd.Timestamp(end)).values
+        elif values:
+            mask &= cube[dim].isin(values).values
+
+    totals = cube[mask].groupby(list(by), sort=True, observed=True)[CUBE_MEASURES].sum()
+    totals['avg_trade_size'] = totals['volume'] / totals['trades']
+    totals['long_ratio'] = totals['buys'] / totals['trades']
+    totals['win_rate'] = totals['wins'] / totals['closed_trades'].where(totals['closed_trades'] > 0)
+    return totals
@@ -0,0 +1,64 @@
+"""
+Process-wide, read-only store of the loaded datasets and their derived tables
+
+One DatasetStore is shared by every dashboard session (st.cache_resource), so
+the trades and daily tables exist once per process instead of once per
+session. Everything handed out is shared: callers must treat tables as
+read-only, and the processing functions they go through never modify their
+inputs. With copy-on-write, a slice or view that a session does modify is
+copied first and never writes through to the shared frame.
+"""
+
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from disk_cache import source_fingerprint
+from filters import sorted_layout
+from loader import FEAR_GREED_PATH, TRADES_PATH, load_datasets
+
+# Derived tables kept per process; the least recently used are dropped beyond this
+MAX_TABLES = 32
+
+# Copy-on-write is always on from pandas 3 and opt-in before that
+if int(pd.__version__.split('.')[0]) < 3:
+    try:
+        pd.set_option('mode.copy_on_write', True)
+    except (AttributeError, KeyError):
+        pass
+
+
+class DatasetStore:
+    def __init__(self, fear_greed_path=FEAR_GREED_PATH, trades_path=TRADES_PATH, max_tables=MAX_TABLES):
+        # Parsed, merged frames are reused from the on-disk cache until the CSVs change
+        self.version = source_fingerprint([fear_greed_path, trades_path])
+        self.fear_greed, self.trades, trades_merged = load_datasets(fear_greed_path, trades_path)
+        # (Account, date) order so filters resolve to binary-search slices
+        self.trades_merged, self.trade_index = sorted_layout(trades_merged)
+
+        self.max_tables = max_tables
+        self._tables = OrderedDict()
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def table(self, key, build):
+        """Derived table for a hashable key, built by build() once per process."""
+        with self._lock:
+            if key in self._tables:
+                self._tables.move_to_end(key)
+                return self._tables[key]
+            key_lock = self._locks.setdefault(key, threading.Lock())
+
+        # Concurrent sessions asking for the same table wait for one build
+        with key_lock:
+            with self._lock:
+                if key in self._tables:
+                    return self._tables[key]
+            table = build()
+            with self._lock:
+                self._tables[key] = table
+                self._locks.pop(key, None)
+                while len(self._tables) > self.max_tables:
+                    self._tables.popitem(last=False)
+        return table
@@ -0,0 +1,94 @@
+"""
+Persistent columnar cache for parsed datasets
+
+Entries are keyed on a fingerprint of their source files (path, size and
+modification time), so editing or replacing a CSV invalidates the cache
+automatically. Parquet is used when pyarrow is installed, pickle otherwise.
+"""
+
+import hashlib
+import os
+import tempfile
+
+import pandas as pd
+
+CACHE_DIR = '.cache'
+
+# Bump when the layout of cached frames changes
+CACHE_VERSION = 3
+
+try:
+    import pyarrow  # noqa: F401
+    CACHE_FORMAT = 'parquet'
+except ImportError:
+    CACHE_FORMAT = 'pickle'
+
+
+def source_fingerprint(paths):
+    """Hash of the path, size and mtime of every source file."""
+    digest = hashlib.sha1(f"v{CACHE_VERSION}".encode())
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f"|{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()[:16]
+
+
+def frame_fingerprint(frame):
+    """Hash of a frame's column names and values (row order included)."""
+    digest = hashlib.sha1('|'.join(map(str, frame.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(frame, index=False).values.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _entry_path(name, key, cache_dir):
+    return os.path.join(cache_dir, f"{name}-{key}.{CACHE_FORMAT}")
+
+
+def read_frame(path):
+    if CACHE_FORMAT == 'parquet':
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def write_frame(frame, path):
+    """Write atomically so readers never see a partial file."""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    # Unique temp file per writer, so concurrent writers never share one
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+    os.close(fd)
+    try:
+        if CACHE_FORMAT == 'parquet':
+            frame.to_parquet(tmp_path, index=False)
+        else:
+            frame.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_cached(name, key, cache_dir=CACHE_DIR):
+    """Cached frame for (name, key), or None on a miss or unreadable entry."""
+    path = _entry_path(name, key, cache_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        return read_frame(path)
+    except Exception:
+        return None
+
+
+def write_cached(name, key, frame, cache_dir=CACHE_DIR):
+    """Store a frame under (name, key) and drop stale entries for the same name."""
+    path = _entry_path(name, key, cache_dir)
+    write_frame(frame, path)
+
+    # Other writers' in-flight temp files are left alone
+    for entry in os.listdir(cache_dir):
+        if entry.startswith(f"{name}-") and not entry.endswith('.tmp') and os.path.join(cache_dir, entry) != path:
+            try:
+                os.remove(os.path.join(cache_dir, entry))
+            except FileNotFoundError:
+                pass
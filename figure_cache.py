@@ -0,0 +1,59 @@
+"""
+Size-bounded LRU cache of rendered chart images
+
+Figures are rendered once per key (page, dataset version, parameters) and
+kept as PNG/SVG bytes; the least recently used images are evicted once the
+cache grows past its byte budget.
+"""
+
+import io
+import threading
+from collections import OrderedDict
+
+MAX_BYTES = 64 * 1024 ** 2
+
+
+def render_figure(fig, fmt='png', dpi=100):
+    """Serialize a figure to image bytes and release it."""
+    import matplotlib.pyplot as plt
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+class FigureCache:
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_render(self, key, build, fmt='png', dpi=100):
+        """Cached image bytes for key, calling build() for the figure on a miss."""
+        key = (key, fmt, dpi)
+        with self._lock:
+            if key in self._images:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return self._images[key]
+
+        image = render_figure(build(), fmt=fmt, dpi=dpi)
+
+        with self._lock:
+            self.misses += 1
+            if key not in self._images:
+                self._images[key] = image
+                self.size += len(image)
+            while self.size > self.max_bytes and len(self._images) > 1:
+                _, evicted = self._images.popitem(last=False)
+                self.size -= len(evicted)
+        return image
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self.size = 0
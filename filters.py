@@ -0,0 +1,90 @@
+"""
+Dashboard filters resolved as binary-search slices
+
+Frames are held sorted by (Account, date). A FilterIndex keeps one sorted
+int64 key per row (account code and day number packed together), so an
+account subset plus a date range resolves to one searchsorted call per bound
+and a contiguous row range per account. Only the sentiment band and coin
+filters, applied to the already sliced rows, need a mask.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+# Keys pack the account code above the day number
+DAY_SPAN = 1 << 32
+
+FG_RANGE = (0, 100)
+
+Filters = namedtuple('Filters', ['start', 'end', 'fg_range', 'coins', 'accounts'])
+Filters.__new__.__defaults__ = (None, None, FG_RANGE, (), ())
+
+
+def _days(dates):
+    return dates.values.astype('datetime64[D]').astype(np.int64)
+
+
+class FilterIndex:
+    def __init__(self, frame):
+        accounts = frame['Account'].astype('category').cat
+        self.accounts = accounts.categories
+        days = _days(frame['date'])
+        self.keys = accounts.codes.values.astype(np.int64) * DAY_SPAN + days
+        # Date bounds for the filter widgets
+        self.first_day = days.min().astype('datetime64[D]').item()
+        self.last_day = days.max().astype('datetime64[D]').item()
+
+    def ranges(self, accounts=(), start=None, end=None):
+        """[lo, hi) row ranges, one per selected account, for dates in [start, end]."""
+        if accounts:
+            codes = self.accounts.get_indexer(list(accounts))
+            codes = np.sort(codes[codes >= 0])
+        else:
+            codes = np.arange(len(self.accounts))
+        codes = codes.astype(np.int64) * DAY_SPAN
+        first = _days_or(start, 0)
+        last = _days_or(end, DAY_SPAN - 1)
+        lo = np.searchsorted(self.keys, codes + first, side='left')
+        hi = np.searchsorted(self.keys, codes + last, side='right')
+        keep = hi > lo
+        return lo[keep], hi[keep]
+
+
+def _days_or(date, default):
+    if date is None:
+        return default
+    return int(np.datetime64(date, 'D').astype(np.int64))
+
+
+def sorted_layout(frame):
+    """frame in (Account, date) order (stable, so same-day rows keep their order) and its FilterIndex."""
+    index = FilterIndex(frame)
+    if not (np.diff(index.keys) >= 0).all():
+        order = np.argsort(index.keys, kind='stable')
+        frame = frame.iloc[order].reset_index(drop=True)
+        index.keys = index.keys[order]
+    return frame, index
+
+
+def apply_filters(frame, index, filters):
+    """
+    Rows of a sorted_layout frame matching filters. The unfiltered frame is
+    returned as is and a single contiguous range as an iloc slice; several
+    account ranges are gathered in one take.
+    """
+    lo, hi = index.ranges(filters.accounts, filters.start, filters.end)
+    if len(lo) == 1:
+        view = frame.iloc[lo[0]:hi[0]]
+    elif (hi - lo).sum() == len(frame):
+        view = frame
+    else:
+        lengths = hi - lo
+        positions = np.repeat(lo - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        view = frame.iloc[positions]
+
+    if tuple(filters.fg_range) != FG_RANGE:
+        view = view[view['fg_value'].between(*filters.fg_range)]
+    if filters.coins and 'Coin' in view:
+        view = view[view['Coin'].isin(filters.coins)]
+    return view
@@ -0,0 +1,151 @@
+"""
+Incremental ingestion of new trade fills
+
+Keeps per-account running state (size sum/count for the leverage baseline,
+last cumulative PnL and its running max) next to the daily_metrics table, so
+a nightly refresh only reads and aggregates the new fills.
+
+Each ingest writes its daily rows as a new part file and then the state,
+which records how many parts it covers. The state write is the commit: a
+part left behind by an ingest that died before it is ignored on read and
+overwritten by the retry, so a re-run never duplicates daily rows.
+
+Usage: python ingest.py <delta.csv | directory of daily CSVs> [--store DIR]
+"""
+
+import argparse
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+from disk_cache import CACHE_DIR, CACHE_FORMAT, read_frame, write_frame
+from loader import FEAR_GREED_PATH, join_sentiment, read_fear_greed, read_trades
+from metrics import build_daily_metrics
+
+STORE_DIR = os.path.join(CACHE_DIR, 'incremental')
+
+STATE_DTYPES = {
+    'size_sum': 'float64',
+    'size_count': 'int64',
+    'cumulative_pnl': 'float64',
+    'max_cumulative_pnl': 'float64',
+    'last_date': 'datetime64[ns]'
+}
+
+
+def _state_path(store_dir):
+    return os.path.join(store_dir, f"state.{CACHE_FORMAT}")
+
+
+def _parts_dir(store_dir):
+    return os.path.join(store_dir, 'daily_metrics')
+
+
+def _part_path(store_dir, number):
+    return os.path.join(_parts_dir(store_dir), f"part-{number:05d}.{CACHE_FORMAT}")
+
+
+def _read_state(store_dir):
+    """(state indexed by Account, number of committed parts)."""
+    path = _state_path(store_dir)
+    if not os.path.exists(path):
+        empty = {col: pd.Series(dtype=dtype) for col, dtype in STATE_DTYPES.items()}
+        return pd.DataFrame(empty, index=pd.Index([], name='Account')), 0
+    state = read_frame(path).set_index('Account')
+    if 'parts' not in state:
+        # Stores written before parts were recorded: every part on disk is committed
+        return state, len(glob.glob(os.path.join(_parts_dir(store_dir), f"part-*.{CACHE_FORMAT}")))
+    return state.drop(columns='parts'), int(state['parts'].iloc[0])
+
+
+def load_state(store_dir=STORE_DIR):
+    """Per-account running state, indexed by Account (empty before the first ingest)."""
+    return _read_state(store_dir)[0]
+
+
+def load_daily_metrics(store_dir=STORE_DIR):
+    """All committed daily_metrics rows, sorted by Account and date."""
+    parts = [_part_path(store_dir, number) for number in range(_read_state(store_dir)[1])]
+    if not parts:
+        return None
+    daily_metrics = pd.concat([read_frame(p) for p in parts], ignore_index=True)
+    return daily_metrics.sort_values(['Account', 'date'], kind='stable').reset_index(drop=True)
+
+
+def _delta_files(source):
+    if os.path.isdir(source):
+        return sorted(glob.glob(os.path.join(source, '*.csv')))
+    return [source]
+
+
+def ingest(source, store_dir=STORE_DIR, fear_greed_path=FEAR_GREED_PATH):
+    """
+    Fold a delta CSV (or a directory of daily CSVs) into the store.
+
+    Leverage for the new fills is measured against each account's average size
+    including the delta; rows already in the store are not restated. Fills on or
+    before an account's last ingested date are rejected, since those days would
+    need a full rebuild. Returns the appended daily_metrics rows.
+    """
+    files = _delta_files(source)
+    if not files:
+        raise ValueError(f"No CSV files found in {source}")
+
+    fear_greed = read_fear_greed(fear_greed_path)
+    delta = join_sentiment(pd.concat([read_trades(f) for f in files], ignore_index=True), fear_greed)
+    delta['Account'] = delta['Account'].astype(str)
+
+    state, parts = _read_state(store_dir)
+
+    last_date = state['last_date'].reindex(delta['Account']).values
+    stale = delta['date'].values <= last_date
+    if stale.any():
+        raise ValueError(
+            f"{int(stale.sum())} fills fall on or before their account's last ingested date; "
+            "rebuild the store from the full history instead"
+        )
+
+    # Running average size per account, including the new fills
+    sizes = delta.groupby('Account')['Size USD'].agg(['sum', 'count'])
+    accounts = state.index.union(sizes.index)
+    state = state.reindex(accounts)
+    state['size_sum'] = state['size_sum'].fillna(0) + sizes['sum'].reindex(accounts, fill_value=0)
+    state['size_count'] = (state['size_count'].fillna(0) + sizes['count'].reindex(accounts, fill_value=0)).astype('int64')
+    avg_size = state['size_sum'] / state['size_count']
+
+    base = avg_size.reindex(delta['Account']).values
+    leverage = pd.DataFrame({'leverage_proxy': delta['Size USD'] / base}, index=delta.index)
+    daily = build_daily_metrics(delta, leverage=leverage)
+
+    # Continue cumulative PnL and its running max from where each account left off
+    prev_cumulative = state['cumulative_pnl'].reindex(daily['Account']).fillna(0).values
+    prev_max = state['max_cumulative_pnl'].reindex(daily['Account']).values
+    daily['cumulative_pnl'] = daily['cumulative_pnl'] + prev_cumulative
+    daily['max_cumulative_pnl'] = np.fmax(
+        daily.groupby('Account', observed=True)['cumulative_pnl'].cummax().values, prev_max
+    )
+    daily['drawdown'] = daily['cumulative_pnl'] - daily['max_cumulative_pnl']
+
+    last_rows = daily.groupby('Account', observed=True).tail(1).set_index('Account')
+    for col in ['cumulative_pnl', 'max_cumulative_pnl']:
+        state.loc[last_rows.index, col] = last_rows[col]
+    state.loc[last_rows.index, 'last_date'] = last_rows['date']
+
+    # Part first, then the state that commits it
+    write_frame(daily, _part_path(store_dir, parts))
+    write_frame(state.rename_axis('Account').reset_index().assign(parts=parts + 1), _state_path(store_dir))
+
+    return daily
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Append new trade fills to the incremental daily_metrics store')
+    parser.add_argument('source', help='Delta CSV or a directory of daily CSV files')
+    parser.add_argument('--store', default=STORE_DIR, help='Store directory')
+    parser.add_argument('--fear-greed', default=FEAR_GREED_PATH, help='Fear & Greed index CSV')
+    args = parser.parse_args()
+
+    appended = ingest(args.source, store_dir=args.store, fear_greed_path=args.fear_greed)
+    print(f"Appended {len(appended)} daily rows for {appended['Account'].nunique()} accounts")
@@ -0,0 +1,28 @@
+"""
+Derived tables built on first access
+
+Each page declares the tables it reads; a table's builder runs (as a profiled
+stage) only when the page first asks for it, and builders may read other
+tables (declared or not), so a page never pays for tables it does not use.
+"""
+
+from profiling import stage
+
+
+class LazyTables:
+    def __init__(self, builders, declared=None):
+        """builders: name -> function(get) returning the table; `get(name)` reads a dependency."""
+        self._builders = builders
+        self._declared = set(builders) if declared is None else set(declared)
+        self._tables = {}
+
+    def __getitem__(self, name):
+        if name not in self._declared:
+            raise KeyError(f"Table {name!r} is not declared for this page")
+        return self._get(name)
+
+    def _get(self, name):
+        if name not in self._tables:
+            with stage(name):
+                self._tables[name] = self._builders[name](self._get)
+        return self._tables[name]
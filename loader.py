@@ -0,0 +1,138 @@
+"""
+Loading and merging of the Fear & Greed index and trade history
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from disk_cache import CACHE_DIR, read_cached, source_fingerprint, write_cached
+from profiling import stage
+
+FEAR_GREED_PATH = 'fear_greed_index.csv'
+TRADES_PATH = 'historical_data.csv'
+
+TIMESTAMP_FORMAT = '%d-%m-%Y %H:%M'
+
+# Columns read from the trades CSV and their in-memory types. Strings are
+# dictionary-encoded as categoricals; PnL and USD size stay float64 because they
+# are summed into daily and cumulative totals, the remaining numerics fit float32.
+# Columns no page or module reads are not loaded: the hash/ID columns
+# (Transaction Hash, Order ID, Trade ID, Timestamp) and Direction, Crossed and Fee.
+TRADE_SCHEMA = {
+    'Account': 'category',
+    'Coin': 'category',
+    'Execution Price': 'float32',
+    'Size Tokens': 'float32',
+    'Size USD': 'float64',
+    'Side': 'category',
+    'Timestamp IST': 'str',
+    'Start Position': 'float32',
+    'Closed PnL': 'float64'
+}
+
+
+def read_fear_greed(path=FEAR_GREED_PATH):
+    fear_greed = pd.read_csv(path)
+    fear_greed['date'] = pd.to_datetime(fear_greed['date'])
+    return fear_greed
+
+
+def read_trades(path=TRADES_PATH):
+    with stage('read_csv') as record:
+        trades = record.frame(pd.read_csv(path, usecols=lambda col: col in TRADE_SCHEMA, dtype=TRADE_SCHEMA))
+    with stage('parse_timestamps'):
+        trades['Timestamp IST'] = pd.to_datetime(trades['Timestamp IST'], format=TIMESTAMP_FORMAT)
+        trades['date'] = trades['Timestamp IST'].dt.normalize()
+    return trades
+
+
+# Fear & Greed index as dense arrays indexed by days since `first_day`
+SentimentIndex = namedtuple('SentimentIndex', ['first_day', 'values', 'codes', 'categories'])
+
+
+def _epoch_days(dates):
+    return pd.to_datetime(dates).values.astype('datetime64[D]').astype(np.int64)
+
+
+def sentiment_index(fear_greed):
+    """Dense day-offset arrays for the index; days missing from it hold NaN / code -1."""
+    days = _epoch_days(fear_greed['date'])
+    first_day = days.min()
+    offsets = days - first_day
+    classification = pd.Categorical(fear_greed['classification'])
+
+    values = np.full(offsets.max() + 1, np.nan, dtype='float32')
+    codes = np.full(offsets.max() + 1, -1, dtype=classification.codes.dtype)
+    values[offsets] = fear_greed['value'].values
+    codes[offsets] = classification.codes
+    return SentimentIndex(first_day, values, codes, classification.categories)
+
+
+def lookup_sentiment(dates, index):
+    """(fg_value array, sentiment Categorical) for each date; NaN outside the index."""
+    offsets = _epoch_days(dates) - index.first_day
+    in_range = (offsets >= 0) & (offsets < len(index.values))
+    positions = np.where(in_range, offsets, 0)
+
+    values = np.where(in_range, index.values[positions], np.nan).astype('float32')
+    codes = np.where(in_range, index.codes[positions], -1)
+    return values, pd.Categorical.from_codes(codes, categories=index.categories)
+
+
+def join_sentiment(trades, fear_greed):
+    """trades with the day's index value (fg_value) and classification (sentiment) attached."""
+    with stage('join_sentiment') as record:
+        values, sentiment = lookup_sentiment(trades['date'], sentiment_index(fear_greed))
+        return record.frame(trades.assign(fg_value=values, sentiment=sentiment))
+
+
+def sentiment_coverage(trades, fear_greed):
+    """Trade counts that get no sentiment: before/after the index range, or on a gap day inside it."""
+    days = _epoch_days(trades['date'])
+    index_days = _epoch_days(fear_greed['date'])
+    before = days < index_days.min()
+    after = days > index_days.max()
+    missing = ~(before | after) & ~np.isin(days, index_days)
+    return {
+        'before_index': int(before.sum()),
+        'after_index': int(after.sum()),
+        'missing_days': int(missing.sum())
+    }
+
+
+def memory_footprint(frame):
+    """Per-column dtype and in-memory size, largest first."""
+    usage = frame.memory_usage(deep=True, index=False)
+    footprint = pd.DataFrame({
+        'dtype': frame.dtypes.astype(str),
+        'MB': usage / 1024 ** 2,
+        'share': usage / usage.sum()
+    })
+    return footprint.sort_values('MB', ascending=False).round(3)
+
+
+def load_datasets(fear_greed_path=FEAR_GREED_PATH, trades_path=TRADES_PATH,
+                  cache_dir=CACHE_DIR, use_cache=True):
+    """
+    Return (fear_greed, trades, trades_merged).
+
+    Parsed, typed frames are cached on disk and reused until either CSV changes.
+    """
+    key = source_fingerprint([fear_greed_path, trades_path])
+
+    with stage('read_disk_cache'):
+        fear_greed = read_cached('fear_greed', key, cache_dir) if use_cache else None
+        trades_merged = read_cached('trades_merged', key, cache_dir) if use_cache else None
+
+    if fear_greed is None or trades_merged is None:
+        fear_greed = read_fear_greed(fear_greed_path)
+        trades_merged = join_sentiment(read_trades(trades_path), fear_greed)
+        if use_cache:
+            with stage('write_disk_cache'):
+                write_cached('fear_greed', key, fear_greed, cache_dir)
+                write_cached('trades_merged', key, trades_merged, cache_dir)
+
+    trades = trades_merged.drop(columns=['fg_value', 'sentiment'])
+    return fear_greed, trades, trades_merged
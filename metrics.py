@@ -0,0 +1,126 @@
+"""
+Shared metric calculations for the dashboard (app.py) and the analysis notebook
+"""
+
+import pandas as pd
+
+from profiling import stage
+
+# Baselines the leverage proxy can be measured against
+LEVERAGE_BASELINES = {
+    'mean': 'leverage_proxy',
+    'median': 'leverage_median',
+    'rolling': 'leverage_rolling'
+}
+
+
+def compute_leverage(trades_merged, baselines=('mean',), window=20):
+    """
+    Position size relative to the account's baseline size, one column per baseline.
+
+    'mean' reproduces the original leverage_proxy (Size USD / account average size),
+    'median' uses the account median and 'rolling' the mean of the account's last
+    `window` trades in timestamp order.
+    """
+    unknown = set(baselines) - set(LEVERAGE_BASELINES)
+    if unknown:
+        raise ValueError(f"Unknown leverage baseline(s): {sorted(unknown)}")
+
+    size = trades_merged['Size USD']
+    by_account = size.groupby(trades_merged['Account'], sort=False, observed=True)
+
+    leverage = pd.DataFrame(index=trades_merged.index)
+    for baseline in baselines:
+        if baseline == 'rolling':
+            order = trades_merged['Timestamp IST'].argsort(kind='stable')
+            ordered = size.iloc[order]
+            base = (ordered.groupby(trades_merged['Account'].iloc[order], sort=False, observed=True)
+                    .rolling(window, min_periods=1).mean()
+                    .reset_index(level=0, drop=True)
+                    .reindex(trades_merged.index))
+        else:
+            base = by_account.transform(baseline)
+        leverage[LEVERAGE_BASELINES[baseline]] = size / base
+
+    return leverage
+
+
+# Collapse the five Fear & Greed classifications into three groups
+SENTIMENT_GROUPS = {
+    'Extreme Fear': 'Fear',
+    'Fear': 'Fear',
+    'Neutral': 'Neutral',
+    'Greed': 'Greed',
+    'Extreme Greed': 'Greed'
+}
+
+
+def build_daily_metrics(trades_merged, leverage_baselines=('mean',), leverage=None):
+    """
+    Per-(Account, date) metrics in a single groupby pass.
+
+    Long ratio, win rate and leverage are derived from precomputed flag/numeric
+    columns, so every metric comes out of one aggregation with no joins.
+    Win rate only counts closed trades and is NaN on days without any.
+    A precomputed `leverage` frame (see compute_leverage) may be passed in place
+    of `leverage_baselines`.
+    """
+    pnl = trades_merged['Closed PnL']
+    frame = pd.DataFrame({
+        'Account': trades_merged['Account'],
+        'date': trades_merged['date'],
+        'Closed PnL': pnl,
+        'Size USD': trades_merged['Size USD'],
+        'is_buy': trades_merged['Side'] == 'BUY',
+        'is_win': pnl > 0,
+        'is_closed': pnl != 0,
+        'sentiment': trades_merged['sentiment'],
+        'fg_value': trades_merged['fg_value']
+    })
+    if leverage is None:
+        with stage('compute_leverage'):
+            leverage = compute_leverage(trades_merged, baselines=leverage_baselines)
+    for col in leverage.columns:
+        frame[col] = leverage[col]
+
+    aggregations = {
+        'daily_pnl': ('Closed PnL', 'sum'),
+        'total_volume': ('Size USD', 'sum'),
+        'avg_trade_size': ('Size USD', 'mean'),
+        'num_trades': ('Size USD', 'count'),
+        'long_ratio': ('is_buy', 'mean'),
+        'sentiment': ('sentiment', 'first'),
+        'fg_value': ('fg_value', 'first'),
+        'wins': ('is_win', 'sum'),
+        'closed_trades': ('is_closed', 'sum')
+    }
+    for col in leverage.columns:
+        aggregations[col] = (col, 'mean')
+
+    with stage('daily_aggregation') as record:
+        grouped = frame.groupby(['Account', 'date'], sort=True, observed=True)
+        daily_metrics = record.frame(grouped.agg(**aggregations).reset_index())
+    return finalize_daily_metrics(daily_metrics)
+
+
+def finalize_daily_metrics(daily_metrics):
+    """
+    Derive win rate, short ratio, cumulative PnL, drawdown and sentiment group
+    from aggregated daily rows sorted by Account and date (with `wins` and
+    `closed_trades` counts in place of the win rate). Returns a new frame.
+    """
+    # Wins are a subset of closed trades, so this is NaN exactly where nothing closed
+    closed = daily_metrics['closed_trades']
+    wins = daily_metrics['wins']
+    daily_metrics = daily_metrics.drop(columns=['closed_trades', 'wins'])
+    daily_metrics.insert(daily_metrics.columns.get_loc('fg_value') + 1, 'win_rate',
+                         wins / closed.where(closed > 0))
+
+    # Additional metrics
+    daily_metrics['short_ratio'] = 1 - daily_metrics['long_ratio']
+    daily_metrics['cumulative_pnl'] = daily_metrics.groupby('Account', observed=True)['daily_pnl'].cumsum()
+    daily_metrics['max_cumulative_pnl'] = daily_metrics.groupby('Account', observed=True)['cumulative_pnl'].cummax()
+    daily_metrics['drawdown'] = daily_metrics['cumulative_pnl'] - daily_metrics['max_cumulative_pnl']
+    daily_metrics['sentiment_group'] = daily_metrics['sentiment'].map(SENTIMENT_GROUPS)
+
+    return daily_metrics
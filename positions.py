@@ -0,0 +1,111 @@
+"""
+Position reconstruction from fills
+
+Each account's fills are walked per Coin in timestamp order with grouped
+cumulative kernels (no Python loop over fills): the running position starts
+from the first fill's `Start Position` and adds each signed fill size. From
+it come position openings and closes, holding periods, the notional reduced
+by closing fills and the account's gross open notional across coins, which
+is summarized per (Account, date) and joined onto daily_metrics.
+
+Positions are marked at their last fill price, and a position held before
+the export begins only counts towards gross notional from its first fill.
+"""
+
+import numpy as np
+import pandas as pd
+
+# A position is flat when smaller than this fraction of the fill that produced it
+FLAT_TOLERANCE = 1e-6
+
+POSITION_COLUMNS = ['max_concurrent_notional', 'eod_notional', 'open_positions',
+                    'positions_closed', 'avg_holding_hours', 'reduced_notional']
+
+
+def _direction(position, scale):
+    """Sign of a position, 0 when flat within tolerance of `scale`."""
+    return np.where(np.abs(position) > FLAT_TOLERANCE * scale, np.sign(position), 0)
+
+
+def reconstruct_positions(trades_merged):
+    """
+    Fill-level position state in (Account, Coin, timestamp) order: position
+    before/after each fill, whether it opens or closes a position, the
+    holding time of a closed position and the notional it reduced.
+    """
+    order = np.lexsort((trades_merged['Timestamp IST'].values,
+                        trades_merged['Coin'].cat.codes.values,
+                        trades_merged['Account'].cat.codes.values))
+    fills = pd.DataFrame({
+        'Account': trades_merged['Account'].values[order],
+        'Coin': trades_merged['Coin'].values[order],
+        'date': trades_merged['date'].values[order],
+        'timestamp': trades_merged['Timestamp IST'].values[order],
+        'price': trades_merged['Execution Price'].values[order].astype('float64')
+    })
+    size = trades_merged['Size Tokens'].values[order].astype('float64')
+    fills['delta'] = np.where(trades_merged['Side'].values[order] == 'BUY', size, -size)
+    start = trades_merged['Start Position'].values[order].astype('float64')
+
+    group = fills.groupby(['Account', 'Coin'], sort=False, observed=True).ngroup().values
+
+    def by_group(values):
+        return pd.Series(values).groupby(group, sort=False)
+
+    first_start = by_group(start).transform('first').values
+    fills['after'] = first_start + by_group(fills['delta'].values).cumsum().values
+    fills['before'] = fills['after'] - fills['delta']
+
+    scale = np.abs(fills['delta'].values)
+    side_after = _direction(fills['after'].values, scale)
+    # Before a fill the side is the previous fill's, except for each group's first fill
+    side_before = by_group(side_after).shift(1).to_numpy(copy=True)
+    first = np.isnan(side_before)
+    side_before[first] = _direction(fills['before'].values[first], scale[first])
+
+    fills['opens'] = (side_after != 0) & (side_after != side_before)
+    fills['closes'] = (side_before != 0) & (side_after != side_before)
+
+    # Holding time back to the opening fill of the position being closed
+    last_open = by_group(fills['timestamp'].where(fills['opens']).values).ffill()
+    opened = last_open.groupby(group, sort=False).shift(1).values
+    held = (fills['timestamp'].values - opened) / np.timedelta64(1, 'h')
+    fills['holding_hours'] = np.where(fills['closes'], held, np.nan)
+
+    reducing = (side_before != 0) & (np.sign(fills['delta'].values) == -side_before)
+    reduced = np.minimum(np.abs(fills['delta'].values), np.abs(fills['before'].values))
+    fills['reduced_notional'] = np.where(reducing, reduced * fills['price'].values, 0.0)
+
+    # Change in this coin's marked notional and open flag, for account-level running sums
+    notional = np.abs(fills['after'].values) * fills['price'].values
+    fills['notional_change'] = notional - by_group(notional).shift(1, fill_value=0).values
+    is_open = (side_after != 0).astype(np.int64)
+    fills['open_change'] = is_open - by_group(is_open).shift(1, fill_value=0).values
+    return fills
+
+
+def position_metrics(trades_merged):
+    """Per-(Account, date) position metrics (POSITION_COLUMNS)."""
+    fills = reconstruct_positions(trades_merged)
+
+    # Account-wide running totals across coins, in timestamp order
+    fills = fills.iloc[np.lexsort((fills['timestamp'].values, fills['Account'].cat.codes.values))]
+    by_account = fills.groupby('Account', sort=False, observed=True)
+    fills = fills.assign(gross_notional=by_account['notional_change'].cumsum(),
+                         open_count=by_account['open_change'].cumsum())
+
+    return fills.groupby(['Account', 'date'], sort=True, observed=True).agg(
+        max_concurrent_notional=('gross_notional', 'max'),
+        eod_notional=('gross_notional', 'last'),
+        open_positions=('open_count', 'last'),
+        positions_closed=('closes', 'sum'),
+        avg_holding_hours=('holding_hours', 'mean'),
+        reduced_notional=('reduced_notional', 'sum')
+    ).reset_index()
+
+
+def join_positions(daily_metrics, positions):
+    """daily_metrics with the position metrics of each (Account, date) added."""
+    columns = positions.set_index(['Account', 'date'])[POSITION_COLUMNS]
+    rows = columns.reindex(pd.MultiIndex.from_arrays([daily_metrics['Account'], daily_metrics['date']]))
+    return daily_metrics.assign(**{col: rows[col].values for col in POSITION_COLUMNS})
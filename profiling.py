@@ -0,0 +1,123 @@
+"""
+Stage-level timing for the pipeline and dashboard pages
+
+A PipelineProfiler collects one record per stage (wall time, rows and bytes
+of the frame it produced). Library code marks stages with `stage(name)`,
+which records into the profiler activated for the current thread and is a
+no-op otherwise, so the same functions run uninstrumented in the notebook
+and the CLIs.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+_local = threading.local()
+
+# A stage log larger than this is rotated to <path>.1 (replacing the previous one)
+LOG_MAX_BYTES = 5 * 1024 ** 2
+
+
+class _StageRecord:
+    def __init__(self, name, depth=0):
+        self.name = name
+        self.depth = depth
+        self.seconds = None
+        self.rows = None
+        self.bytes = None
+
+    def frame(self, frame):
+        """Record the size of the frame this stage produced."""
+        self.rows = len(frame)
+        self.bytes = int(frame.memory_usage(index=True).sum())
+        return frame
+
+    def as_dict(self):
+        return {'stage': self.name, 'depth': self.depth, 'seconds': self.seconds,
+                'rows': self.rows, 'bytes': self.bytes}
+
+
+class PipelineProfiler:
+    def __init__(self):
+        self.records = []
+        self._depth = 0
+
+    @contextmanager
+    def stage(self, name):
+        """Time a stage; stages opened inside it are recorded one level deeper."""
+        record = _StageRecord(name, self._depth)
+        self.records.append(record)
+        self._depth += 1
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = round(time.perf_counter() - started, 4)
+            self._depth -= 1
+
+    def total_seconds(self):
+        """Wall time of the top-level stages (nested stages are already included in them)."""
+        return round(sum(record.seconds for record in self.records if record.depth == 0), 4)
+
+    def table(self):
+        rows = [dict(record.as_dict(), stage='  ' * record.depth + record.name) for record in self.records]
+        table = pd.DataFrame(rows, columns=['stage', 'depth', 'seconds', 'rows', 'bytes'])
+        return table.drop(columns='depth').astype({'rows': 'Int64', 'bytes': 'Int64'})
+
+    def to_json(self):
+        return json.dumps({
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'total_seconds': self.total_seconds(),
+            'stages': [record.as_dict() for record in self.records]
+        })
+
+    def write_log(self, path, max_bytes=LOG_MAX_BYTES):
+        """Append this run as one JSON line, rotating the log once it passes max_bytes."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        try:
+            if os.path.getsize(path) > max_bytes:
+                os.replace(path, path + '.1')
+        except OSError:
+            pass
+        with open(path, 'a') as f:
+            f.write(self.to_json() + '\n')
+
+
+def activate(profiler):
+    """Route `stage` calls on this thread to `profiler` (None to stop)."""
+    _local.profiler = profiler
+
+
+@contextmanager
+def stage(name):
+    profiler = getattr(_local, 'profiler', None)
+    if profiler is None:
+        yield _StageRecord(name)
+        return
+    with profiler.stage(name) as record:
+        yield record
+
+
+def dump_cprofile(profile, directory, top=25):
+    """Save cProfile stats to `directory`; return (path, text summary of the top functions)."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"profile-{datetime.now():%Y%m%d-%H%M%S}.prof")
+    profile.dump_stats(path)
+
+    summary = io.StringIO()
+    pstats.Stats(profile, stream=summary).sort_stats('cumulative').print_stats(top)
+    return path, summary.getvalue()
+
+
+def start_cprofile():
+    profile = cProfile.Profile()
+    profile.enable()
+    return profile
@@ -0,0 +1,142 @@
+"""
+Headless batch report: the notebook's outputs/ tables and charts without Jupyter
+
+Runs the shared load/process/segment pipeline once (daily metrics built per
+account partition on a process pool, see parallel.py), then writes every table
+and chart on a process pool. A manifest in the output directory records the
+fingerprint of each artifact's input, so unchanged artifacts are skipped and
+a run on unchanged source CSVs returns without loading anything.
+
+Usage: python report.py [--output-dir outputs] [--workers N] [--force]
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use('Agg')
+
+import pandas as pd
+
+from charts import (behavior_figure, correlation_figure, cumulative_pnl_figure, performance_figure,
+                    segment_sentiment_figure, segments_figure)
+from clustering import cluster_segments
+from disk_cache import frame_fingerprint, source_fingerprint
+from figure_cache import render_figure
+from loader import FEAR_GREED_PATH, TRADES_PATH, load_datasets
+from parallel import parallel_daily_metrics
+from segments import attach_segments, build_trader_stats
+
+OUTPUT_DIR = 'outputs'
+MANIFEST = '.manifest.json'
+DPI = 300
+
+# Artifact file -> (chart function or None for a table, input table)
+ARTIFACTS = {
+    'daily_metrics_processed.csv': (None, 'daily_metrics_with_segments'),
+    'trader_segments.csv': (None, 'trader_stats'),
+    'analysis_summary.csv': (None, 'summary'),
+    'performance_by_sentiment.png': (performance_figure, 'daily_metrics'),
+    'behavior_by_sentiment.png': (behavior_figure, 'daily_metrics'),
+    'segment_analysis.png': (segments_figure, 'trader_stats'),
+    'correlation_heatmap.png': (correlation_figure, 'daily_metrics'),
+    'cumulative_pnl_timeline.png': (cumulative_pnl_figure, 'daily_metrics'),
+    'segment_sentiment_performance.png': (segment_sentiment_figure, 'daily_metrics_with_segments')
+}
+
+
+def summary_table(daily_metrics, trader_stats):
+    """High-level summary statistics (analysis_summary.csv)."""
+    fear = daily_metrics[daily_metrics['sentiment_group'] == 'Fear']
+    greed = daily_metrics[daily_metrics['sentiment_group'] == 'Greed']
+    return pd.DataFrame([{
+        'Total Traders': trader_stats['Account'].nunique(),
+        'Total Trading Days': daily_metrics['date'].nunique(),
+        'Avg Daily PnL (Fear)': fear['daily_pnl'].mean(),
+        'Avg Daily PnL (Greed)': greed['daily_pnl'].mean(),
+        'Win Rate (Fear)': fear['win_rate'].mean(),
+        'Win Rate (Greed)': greed['win_rate'].mean()
+    }])
+
+
+def build_tables(fear_greed_path=FEAR_GREED_PATH, trades_path=TRADES_PATH, workers=None):
+    """Every input table the artifacts are built from, by name (daily metrics on `workers` processes)."""
+    _, _, trades_merged = load_datasets(fear_greed_path, trades_path)
+    daily_metrics = parallel_daily_metrics(trades_merged, workers)
+    trader_stats = cluster_segments(daily_metrics, build_trader_stats(daily_metrics))
+    return {
+        'daily_metrics': daily_metrics,
+        'daily_metrics_with_segments': attach_segments(daily_metrics, trader_stats),
+        'trader_stats': trader_stats,
+        'summary': summary_table(daily_metrics, trader_stats)
+    }
+
+
+def _write_artifact(args):
+    path, chart, table = args
+    started = time.perf_counter()
+    if chart is None:
+        table.to_csv(path, index=False)
+    else:
+        with open(path, 'wb') as f:
+            f.write(render_figure(chart(table), dpi=DPI))
+    return path, round(time.perf_counter() - started, 2)
+
+
+def _read_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def run_report(output_dir=OUTPUT_DIR, fear_greed_path=FEAR_GREED_PATH, trades_path=TRADES_PATH,
+               workers=None, force=False):
+    """Write outdated artifacts to output_dir; return the list of files written."""
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = {} if force else _read_manifest(output_dir)
+    dataset_version = source_fingerprint([fear_greed_path, trades_path])
+
+    def up_to_date(name, key):
+        return key is not None and manifest.get(name) == key and os.path.exists(os.path.join(output_dir, name))
+
+    if manifest.get('dataset') == dataset_version and all(up_to_date(name, manifest.get(name)) for name in ARTIFACTS):
+        print(f"{output_dir}/ is up to date")
+        return []
+
+    tables = build_tables(fear_greed_path, trades_path, workers)
+    table_keys = {name: frame_fingerprint(table) for name, table in tables.items()}
+
+    jobs = [(os.path.join(output_dir, name), chart, tables[source])
+            for name, (chart, source) in ARTIFACTS.items()
+            if not up_to_date(name, table_keys[source])]
+
+    written = []
+    if jobs:
+        with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(jobs))) as pool:
+            for path, seconds in pool.map(_write_artifact, jobs):
+                print(f"Wrote {path} ({seconds:.2f}s)")
+                written.append(path)
+
+    manifest = {name: table_keys[source] for name, (_, source) in ARTIFACTS.items()}
+    manifest['dataset'] = dataset_version
+    with open(os.path.join(output_dir, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"{len(written)} written, {len(ARTIFACTS) - len(written)} unchanged")
+    return written
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Write the analysis tables and charts without Jupyter')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help='Directory for CSVs and PNGs')
+    parser.add_argument('--fear-greed', default=FEAR_GREED_PATH, help='Fear & Greed index CSV')
+    parser.add_argument('--trades', default=TRADES_PATH, help='Trades CSV')
+    parser.add_argument('--workers', type=int, help='Processes for the daily metrics and the writers (default: all cores)')
+    parser.add_argument('--force', action='store_true', help='Rewrite every artifact')
+    args = parser.parse_args()
+
+    run_report(args.output_dir, args.fear_greed, args.trades, args.workers, args.force)
@@ -0,0 +1,80 @@
+"""
+Drawdown and risk-adjusted return metrics from daily_metrics
+
+Per Account, or per (Account, sentiment_group) where each regime's days form
+their own PnL path: max drawdown, the longest stretch below a previous peak,
+and Sharpe / Sortino ratios of daily PnL. The running sums, peaks and
+underwater spans are grouped cumulative kernels over one sorted copy of the
+rows, followed by a single aggregation.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Daily PnL covers every calendar day (crypto trades through weekends)
+PERIODS_PER_YEAR = 365
+
+# Cumulative PnL within this much (USD) of its peak counts as at the peak;
+# grouped cumsum can land a rounding error below it after zero-PnL days
+PEAK_TOLERANCE = 1e-6
+
+RISK_COLUMNS = ['days', 'total_pnl', 'mean_pnl', 'pnl_std', 'max_drawdown',
+                'max_drawdown_duration', 'sharpe', 'sortino']
+
+
+def risk_metrics(daily_metrics, by=('Account',), periods_per_year=PERIODS_PER_YEAR, calendar_duration=True):
+    """
+    One row per group in `by`. max_drawdown is the deepest fall (<= 0) of the
+    group's cumulative PnL from its running peak, which starts at 0 (so a loss
+    on the first day counts); max_drawdown_duration is the longest stretch
+    below a peak, in calendar days, or with calendar_duration=False in days of
+    the group's own path (for paths that skip days, such as one regime's days).
+    Sharpe and Sortino are annualized with `periods_per_year`; Sortino uses
+    the downside deviation of daily PnL.
+    """
+    keys = list(by)
+    frame = daily_metrics[keys + ['date', 'daily_pnl']].dropna(subset=keys)
+    frame = frame.sort_values(keys + ['date'], kind='stable')
+    grouped = frame.groupby(keys, sort=False, observed=True)
+
+    frame['cumulative'] = grouped['daily_pnl'].cumsum()
+    frame['peak'] = frame.groupby(keys, sort=False, observed=True)['cumulative'].cummax().clip(lower=0)
+    frame['drawdown'] = frame['cumulative'] - frame['peak']
+
+    # Time since the group's last high-water mark; before any, the start of the path
+    at_peak = frame['drawdown'] >= -PEAK_TOLERANCE
+    by_group = [frame[key] for key in keys]
+    if calendar_duration:
+        start = grouped['date'].transform('first') - pd.Timedelta(days=1)
+        peak_date = frame['date'].where(at_peak).groupby(by_group, sort=False, observed=True).ffill()
+        frame['underwater_days'] = (frame['date'] - peak_date.fillna(start)).dt.days
+    else:
+        position = grouped.cumcount()
+        peak_position = position.where(at_peak).groupby(by_group, sort=False, observed=True).ffill()
+        frame['underwater_days'] = (position - peak_position.fillna(-1)).astype('int64')
+    frame['downside_sq'] = np.minimum(frame['daily_pnl'], 0) ** 2
+
+    risk = frame.groupby(keys, sort=True, observed=True).agg(
+        days=('daily_pnl', 'count'),
+        total_pnl=('daily_pnl', 'sum'),
+        mean_pnl=('daily_pnl', 'mean'),
+        pnl_std=('daily_pnl', 'std'),
+        downside_var=('downside_sq', 'mean'),
+        max_drawdown=('drawdown', 'min'),
+        max_drawdown_duration=('underwater_days', 'max')
+    )
+
+    scale = np.sqrt(periods_per_year)
+    risk['sharpe'] = risk['mean_pnl'] / risk['pnl_std'].where(risk['pnl_std'] > 0) * scale
+    downside = np.sqrt(risk.pop('downside_var'))
+    risk['sortino'] = risk['mean_pnl'] / downside.where(downside > 0) * scale
+    return risk[RISK_COLUMNS].reset_index()
+
+
+def build_risk_tables(daily_metrics):
+    """
+    (per-Account risk, per-(Account, sentiment_group) risk); the regime
+    table's drawdown durations count that regime's days only.
+    """
+    return (risk_metrics(daily_metrics, by=('Account',)),
+            risk_metrics(daily_metrics, by=('Account', 'sentiment_group'), calendar_duration=False))
@@ -0,0 +1,44 @@
+"""
+Trader-level statistics and median-split segments shared by the segment and strategy views
+"""
+
+import numpy as np
+import pandas as pd
+
+# (segment column, source column, label above the median, label at or below it)
+SEGMENT_RULES = [
+    ('leverage_segment', 'avg_leverage', 'High Leverage', 'Low Leverage'),
+    ('frequency_segment', 'avg_trades_per_day', 'Frequent', 'Infrequent'),
+    ('consistency_segment', 'consistency_score', 'Consistent Winner', 'Inconsistent')
+]
+
+SEGMENT_COLUMNS = [rule[0] for rule in SEGMENT_RULES]
+
+
+def build_trader_stats(daily_metrics):
+    """Per-account statistics with leverage, frequency and consistency segments."""
+    trader_stats = daily_metrics.groupby('Account', observed=True).agg(
+        avg_daily_pnl=('daily_pnl', 'mean'),
+        pnl_volatility=('daily_pnl', 'std'),
+        total_pnl=('daily_pnl', 'sum'),
+        avg_trades_per_day=('num_trades', 'mean'),
+        avg_leverage=('leverage_proxy', 'mean'),
+        avg_win_rate=('win_rate', 'mean')
+    ).reset_index()
+
+    trader_stats['consistency_score'] = trader_stats['avg_daily_pnl'] / (trader_stats['pnl_volatility'] + 1)
+
+    # Segment = above the median of its metric; stored as categoricals
+    for segment, source, above, below in SEGMENT_RULES:
+        values = trader_stats[source]
+        labels = np.where(values > values.median(), above, below)
+        trader_stats[segment] = pd.Categorical(labels, categories=[above, below])
+
+    return trader_stats
+
+
+def attach_segments(daily_metrics, trader_stats):
+    """daily_metrics with each account's segment labels (incl. clusters, if assigned) added as columns."""
+    columns = SEGMENT_COLUMNS + [col for col in ['cluster_segment'] if col in trader_stats]
+    rows = trader_stats.set_index('Account')[columns].reindex(daily_metrics['Account'])
+    return daily_metrics.assign(**{col: rows[col].values for col in columns})
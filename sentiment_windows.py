@@ -0,0 +1,82 @@
+"""
+Windowed Fear & Greed analytics
+
+Rolling averages, regime durations and lagged sentiment are computed once over
+the dense day-offset arrays of the sentiment index (see loader.sentiment_index)
+with cumulative-sum and run-length kernels, then joined to daily_metrics by
+array lookup. Days missing from the index are skipped by the rolling mean and
+break regimes.
+"""
+
+import numpy as np
+import pandas as pd
+
+from loader import sentiment_index
+
+# Band edges used by the strategy rules: Fear below 30, Greed above 70
+BAND_EDGES = (30, 70)
+BAND_LABELS = ['Fear', 'Neutral', 'Greed']
+
+
+def rolling_mean(values, window):
+    """Trailing `window`-day mean of the days present (NaN where none are)."""
+    present = ~np.isnan(values)
+    sums = np.concatenate([[0], np.cumsum(np.where(present, values, 0), dtype='float64')])
+    counts = np.concatenate([[0], np.cumsum(present)])
+    end = np.arange(1, len(values) + 1)
+    start = np.maximum(end - window, 0)
+    count = counts[end] - counts[start]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(count > 0, (sums[end] - sums[start]) / count, np.nan)
+
+
+def band_codes(values, edges=BAND_EDGES):
+    """0 below the lower edge, 2 above the upper edge, 1 in between inclusive; -1 where missing."""
+    low, high = edges
+    codes = (values >= low).astype(np.int64) + (values > high)
+    return np.where(np.isnan(values), -1, codes)
+
+
+def regime_days(codes):
+    """Consecutive days each day's band has lasted, counting the day itself (0 when missing)."""
+    positions = np.arange(len(codes))
+    changed = np.ones(len(codes), dtype=bool)
+    changed[1:] = codes[1:] != codes[:-1]
+    run_start = np.maximum.accumulate(np.where(changed, positions, 0))
+    return np.where(codes >= 0, positions - run_start + 1, 0)
+
+
+def _lagged(array, lag, fill):
+    if lag == 0:
+        return array
+    return np.concatenate([np.full(lag, fill, dtype=array.dtype), array[:-lag]])
+
+
+def join_sentiment_windows(daily_metrics, fear_greed, window=3, lags=(1,), edges=BAND_EDGES, labels=BAND_LABELS):
+    """
+    daily_metrics with fg_ma<window>, fg_band (band of that average),
+    regime_days and fg_lag<k> / fg_ma<window>_lag<k> / sentiment_lag<k> for
+    each k in `lags` added.
+    """
+    index = sentiment_index(fear_greed)
+    smoothed = rolling_mean(index.values, window)
+    bands = band_codes(smoothed, edges)
+
+    offsets = daily_metrics['date'].values.astype('datetime64[D]').astype(np.int64) - index.first_day
+    in_range = (offsets >= 0) & (offsets < len(index.values))
+    positions = np.where(in_range, offsets, 0)
+
+    def take(array, fill):
+        return np.where(in_range, array[positions], fill)
+
+    columns = {
+        f'fg_ma{window}': take(smoothed, np.nan).astype('float32'),
+        'fg_band': pd.Categorical.from_codes(take(bands, -1), categories=labels),
+        'regime_days': take(regime_days(bands), 0)
+    }
+    for lag in lags:
+        columns[f'fg_lag{lag}'] = take(_lagged(index.values, lag, np.nan), np.nan).astype('float32')
+        columns[f'fg_ma{window}_lag{lag}'] = take(_lagged(smoothed, lag, np.nan), np.nan).astype('float32')
+        columns[f'sentiment_lag{lag}'] = pd.Categorical.from_codes(
+            take(_lagged(index.codes, lag, -1), -1), categories=index.categories)
+    return daily_metrics.assign(**columns)
@@ -0,0 +1,103 @@
+"""
+Bootstrap confidence intervals and permutation tests for group comparisons
+
+Resamples are drawn in batches as index (bootstrap) or shuffled-value
+(permutation) matrices, one row per resample, and reduced with a single
+NumPy call per batch. Batch size is capped so a batch never holds more than
+MAX_CELLS values; batches can optionally run on a process pool. Each batch
+has its own seed spawned from `seed`, so results do not depend on `workers`.
+
+Resampling costs O(resamples x n); above NORMAL_ABOVE values in total the
+CI and p-value come from the normal approximation of Welch's t instead,
+which at that size agrees with the resampled ones.
+"""
+
+import math
+import os
+from collections import namedtuple
+from statistics import NormalDist
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+RESAMPLES = 2000
+MAX_CELLS = 4_000_000
+NORMAL_ABOVE = 10_000
+
+# method: 'resampling' (bootstrap CI, permutation p) or 'normal'
+Comparison = namedtuple('Comparison', ['diff', 'ci_low', 'ci_high', 'p_value', 'n_a', 'n_b', 'method'])
+
+
+def _batches(resamples, n, seed):
+    """(batch size, seed) pairs covering `resamples` rows of length n."""
+    size = max(1, min(resamples, MAX_CELLS // max(n, 1)))
+    counts = [size] * (resamples // size) + ([resamples % size] if resamples % size else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(counts))
+    return list(zip(counts, seeds))
+
+
+def _bootstrap_batch(args):
+    a, b, count, seed = args
+    rng = np.random.default_rng(seed)
+    means_a = a[rng.integers(0, len(a), (count, len(a)))].mean(axis=1)
+    means_b = b[rng.integers(0, len(b), (count, len(b)))].mean(axis=1)
+    return means_b - means_a
+
+
+def _permutation_batch(args):
+    pooled, n_a, count, seed = args
+    rng = np.random.default_rng(seed)
+    shuffled = rng.permuted(np.broadcast_to(pooled, (count, len(pooled))), axis=1)
+    sum_a = shuffled[:, :n_a].sum(axis=1)
+    return (pooled.sum() - sum_a) / (len(pooled) - n_a) - sum_a / n_a
+
+
+def _run(func, jobs, workers):
+    if workers == 1 or len(jobs) == 1:
+        return np.concatenate([func(job) for job in jobs])
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return np.concatenate(list(pool.map(func, jobs)))
+
+
+def _normal_comparison(a, b, alpha):
+    """Welch normal-approximation CI and two-sided p-value."""
+    observed = b.mean() - a.mean()
+    se = math.sqrt(a.var(ddof=1) / len(a) + b.var(ddof=1) / len(b))
+    if se == 0:
+        return Comparison(observed, observed, observed, 1.0 if observed == 0 else 0.0, len(a), len(b), 'normal')
+    z = NormalDist().inv_cdf(1 - alpha / 2)
+    p_value = math.erfc(abs(observed) / se / math.sqrt(2))
+    return Comparison(observed, observed - z * se, observed + z * se, p_value, len(a), len(b), 'normal')
+
+
+def compare_means(a, b, resamples=RESAMPLES, alpha=0.05, seed=0, workers=1, normal_above=NORMAL_ABOVE):
+    """
+    Difference in means (b - a) with a percentile bootstrap CI at level
+    1 - alpha and a two-sided permutation p-value, or their normal
+    approximation when the two samples hold more than `normal_above` values
+    (None: always resample). NaNs are dropped; with fewer than two values
+    on either side the CI and p-value are NaN.
+    `workers` > 1 spreads batches over processes (None: all cores).
+    """
+    a = np.asarray(a, dtype='float64')
+    b = np.asarray(b, dtype='float64')
+    a, b = a[~np.isnan(a)], b[~np.isnan(b)]
+    if len(a) < 2 or len(b) < 2:
+        diff = b.mean() - a.mean() if len(a) and len(b) else np.nan
+        return Comparison(diff, np.nan, np.nan, np.nan, len(a), len(b), 'resampling')
+    if normal_above is not None and len(a) + len(b) > normal_above:
+        return _normal_comparison(a, b, alpha)
+
+    workers = workers or os.cpu_count() or 1
+    observed = b.mean() - a.mean()
+
+    jobs = [(a, b, count, batch_seed) for count, batch_seed in _batches(resamples, len(a) + len(b), seed)]
+    boot = _run(_bootstrap_batch, jobs, workers)
+    ci_low, ci_high = np.percentile(boot, [100 * alpha / 2, 100 * (1 - alpha / 2)])
+
+    pooled = np.concatenate([a, b])
+    jobs = [(pooled, len(a), count, batch_seed) for count, batch_seed in _batches(resamples, len(pooled), seed + 1)]
+    null = _run(_permutation_batch, jobs, workers)
+    p_value = (np.sum(np.abs(null) >= abs(observed)) + 1) / (len(null) + 1)
+
+    return Comparison(observed, ci_low, ci_high, p_value, len(a), len(b), 'resampling')
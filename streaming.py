@@ -0,0 +1,120 @@
+"""
+Chunked streaming build of daily_metrics for trade histories larger than RAM
+
+The trades CSV is read in chunks; each chunk is joined to the Fear & Greed
+index through a day-offset array lookup and reduced to additive
+per-(Account, date) partials. Partials are folded into a running aggregate
+whenever the held partial rows outgrow it (see _fold), so peak memory is
+bounded by the chunk size plus a small multiple of the number of trader-days
+rather than by the number of trades or chunks.
+
+Usage: python streaming.py [historical_data.csv] [--chunksize N] [--output FILE]
+"""
+
+import argparse
+
+import pandas as pd
+
+from disk_cache import write_frame
+from loader import (FEAR_GREED_PATH, TIMESTAMP_FORMAT, TRADE_SCHEMA, TRADES_PATH, lookup_sentiment,
+                    read_fear_greed, sentiment_index)
+from metrics import finalize_daily_metrics
+
+CHUNKSIZE = 500_000
+
+# Only the columns daily_metrics needs are read from each chunk
+STREAM_COLUMNS = ['Account', 'Side', 'Size USD', 'Closed PnL', 'Timestamp IST']
+
+PARTIAL_COLUMNS = ['daily_pnl', 'total_volume', 'num_trades', 'buys', 'wins', 'closed_trades']
+
+
+def _chunk_partials(chunk, index):
+    """Additive per-(Account, date) sums for one chunk of raw trades."""
+    date = pd.to_datetime(chunk['Timestamp IST'], format=TIMESTAMP_FORMAT).dt.normalize()
+    fg_value, sentiment = lookup_sentiment(date, index)
+    pnl = chunk['Closed PnL']
+    frame = pd.DataFrame({
+        'Account': chunk['Account'].astype(str),
+        'date': date,
+        'daily_pnl': pnl,
+        'total_volume': chunk['Size USD'],
+        'num_trades': chunk['Size USD'].notna(),
+        'buys': chunk['Side'] == 'BUY',
+        'wins': pnl > 0,
+        'closed_trades': pnl != 0,
+        'trades': 1,
+        'sentiment': sentiment,
+        'fg_value': fg_value
+    })
+    grouped = frame.groupby(['Account', 'date'], sort=False)
+    partials = grouped[PARTIAL_COLUMNS + ['trades']].sum()
+    partials[['sentiment', 'fg_value']] = grouped[['sentiment', 'fg_value']].first()
+    return partials
+
+
+def _combine(partials, sort=False):
+    """Merge partials for (Account, date) pairs that straddle chunk boundaries."""
+    combined = pd.concat(partials).groupby(level=['Account', 'date'], sort=sort)
+    daily = combined[PARTIAL_COLUMNS + ['trades']].sum()
+    daily[['sentiment', 'fg_value']] = combined[['sentiment', 'fg_value']].first()
+    return daily
+
+
+def _fold(chunks, index):
+    """
+    Running aggregate over the chunks: held partials are re-grouped into one
+    frame once they outgrow twice the aggregate (or twice a chunk's partials),
+    so each fold's cost is paid for by the rows added since the last one and
+    at most about 3x max(trader-days, chunk partials) rows are held.
+    """
+    held, held_rows, aggregate_rows = [], 0, 0
+    for chunk in chunks:
+        held.append(_chunk_partials(chunk, index))
+        held_rows += len(held[-1])
+        if held_rows > 2 * max(aggregate_rows, len(held[-1])):
+            held = [_combine(held)]
+            held_rows = aggregate_rows = len(held[0])
+    return _combine(held, sort=True)
+
+
+def stream_daily_metrics(trades_path=TRADES_PATH, fear_greed_path=FEAR_GREED_PATH, chunksize=CHUNKSIZE):
+    """
+    Same daily_metrics as process_data/build_daily_metrics (mean-baseline
+    leverage), built without holding the full trades table in memory.
+    """
+    fear_greed = read_fear_greed(fear_greed_path)
+    index = sentiment_index(fear_greed)
+
+    reader = pd.read_csv(trades_path, usecols=STREAM_COLUMNS, chunksize=chunksize,
+                         dtype={col: TRADE_SCHEMA[col] for col in STREAM_COLUMNS})
+    daily = _fold(reader, index).reset_index()
+
+    daily['avg_trade_size'] = daily['total_volume'] / daily['num_trades']
+    daily['long_ratio'] = daily['buys'] / daily['trades']
+
+    # A day's mean leverage is its mean size over the account's overall mean size
+    account_totals = daily.groupby('Account')[['total_volume', 'num_trades']].transform('sum')
+    account_avg_size = account_totals['total_volume'] / account_totals['num_trades']
+    daily['leverage_proxy'] = daily['avg_trade_size'] / account_avg_size
+
+    daily['Account'] = daily['Account'].astype('category')
+    daily['sentiment'] = daily['sentiment'].astype('category')
+    daily['fg_value'] = daily['fg_value'].astype('float32')
+
+    daily_metrics = daily[['Account', 'date', 'daily_pnl', 'total_volume', 'avg_trade_size',
+                           'num_trades', 'long_ratio', 'sentiment', 'fg_value',
+                           'wins', 'closed_trades', 'leverage_proxy']]
+    return finalize_daily_metrics(daily_metrics)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build daily_metrics from a large trades CSV in chunks')
+    parser.add_argument('trades', nargs='?', default=TRADES_PATH, help='Trades CSV')
+    parser.add_argument('--fear-greed', default=FEAR_GREED_PATH, help='Fear & Greed index CSV')
+    parser.add_argument('--chunksize', type=int, default=CHUNKSIZE, help='Rows per chunk')
+    parser.add_argument('--output', default='daily_metrics.parquet', help='Output file')
+    args = parser.parse_args()
+
+    daily_metrics = stream_daily_metrics(args.trades, args.fear_greed, args.chunksize)
+    write_frame(daily_metrics, args.output)
+    print(f"Wrote {len(daily_metrics)} daily rows to {args.output}")
@@ -0,0 +1,35 @@
+"""
+Shared fixtures: a synthetic trades export joined to the bundled Fear & Greed index
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmark import generate_trades  # noqa: E402
+from loader import join_sentiment, read_fear_greed, read_trades  # noqa: E402
+
+
+
+@pytest.fixture(scope='session')
+def trades_path(tmp_path_factory):
+    return generate_trades(str(tmp_path_factory.mktemp('data') / 'historical_data.csv'), 20_000, accounts=30)
+
+
+@pytest.fixture(scope='session')
+def fear_greed_path():
+    return os.path.join(ROOT, 'fear_greed_index.csv')
+
+
+@pytest.fixture(scope='session')
+def fear_greed(fear_greed_path):
+    return read_fear_greed(fear_greed_path)
+
+
+@pytest.fixture(scope='session')
+def trades_merged(trades_path, fear_greed):
+    return join_sentiment(read_trades(trades_path), fear_greed)
@@ -0,0 +1,78 @@
+"""
+daily_metrics engines against the original process_data and each other
+"""
+
+import numpy as np
+import pandas as pd
+
+from metrics import SENTIMENT_GROUPS, build_daily_metrics
+from parallel import parallel_daily_metrics
+from streaming import stream_daily_metrics
+
+
+def baseline_daily_metrics(trades_merged):
+    """The dashboard's original process_data (per-row leverage vectorized)."""
+    trades = trades_merged.assign(Account=trades_merged['Account'].astype(str),
+                                  sentiment=trades_merged['sentiment'].astype(object))
+    daily_metrics = trades.groupby(['Account', 'date']).agg({
+        'Closed PnL': 'sum',
+        'Size USD': ['sum', 'mean', 'count'],
+        'Side': lambda x: (x == 'BUY').sum() / len(x),
+        'sentiment': 'first',
+        'fg_value': 'first'
+    }).reset_index()
+    daily_metrics.columns = ['Account', 'date', 'daily_pnl', 'total_volume',
+                             'avg_trade_size', 'num_trades', 'long_ratio', 'sentiment', 'fg_value']
+
+    closed = trades[trades['Closed PnL'] != 0]
+    win_rate = (closed['Closed PnL'] > 0).groupby([closed['Account'], closed['date']]).mean().reset_index(name='win_rate')
+    daily_metrics = daily_metrics.merge(win_rate, on=['Account', 'date'], how='left')
+
+    account_avg_size = trades.groupby('Account')['Size USD'].mean()
+    trades['leverage_proxy'] = trades['Size USD'] / trades['Account'].map(account_avg_size)
+    daily_leverage = trades.groupby(['Account', 'date'])['leverage_proxy'].mean().reset_index()
+    daily_metrics = daily_metrics.merge(daily_leverage, on=['Account', 'date'], how='left')
+
+    daily_metrics['short_ratio'] = 1 - daily_metrics['long_ratio']
+    daily_metrics = daily_metrics.sort_values(['Account', 'date']).reset_index(drop=True)
+    daily_metrics['cumulative_pnl'] = daily_metrics.groupby('Account')['daily_pnl'].cumsum()
+    daily_metrics['sentiment_group'] = daily_metrics['sentiment'].map(SENTIMENT_GROUPS)
+    return daily_metrics
+
+
+def assert_same_metrics(actual, expected, columns):
+    actual = actual.reset_index(drop=True)
+    expected = expected.reset_index(drop=True)
+    assert len(actual) == len(expected)
+    assert (actual['Account'].astype(str).values == expected['Account'].astype(str).values).all()
+    assert (actual['date'].values == expected['date'].values).all()
+    for col in columns:
+        if actual[col].dtype.kind in 'fiub':
+            np.testing.assert_allclose(actual[col].astype('float64'), expected[col].astype('float64'),
+                                       rtol=1e-6, err_msg=col)
+        else:
+            assert (actual[col].astype(object).fillna('').values == expected[col].astype(object).fillna('').values).all(), col
+
+
+NUMERIC_COLUMNS = ['daily_pnl', 'total_volume', 'avg_trade_size', 'num_trades', 'long_ratio', 'fg_value',
+                   'win_rate', 'leverage_proxy', 'short_ratio', 'cumulative_pnl']
+
+
+def test_build_daily_metrics_matches_baseline(trades_merged):
+    expected = baseline_daily_metrics(trades_merged)
+    assert_same_metrics(build_daily_metrics(trades_merged), expected,
+                        NUMERIC_COLUMNS + ['sentiment', 'sentiment_group'])
+
+
+def test_parallel_matches_build_daily_metrics(trades_merged):
+    expected = build_daily_metrics(trades_merged)
+    pd.testing.assert_frame_equal(parallel_daily_metrics(trades_merged, workers=3), expected)
+
+
+def test_streaming_matches_build_daily_metrics(trades_merged, trades_path, fear_greed_path):
+    expected = build_daily_metrics(trades_merged)
+    # Small chunks, so (Account, date) pairs straddle chunks and partials are folded repeatedly
+    actual = stream_daily_metrics(trades_path, fear_greed_path, chunksize=700)
+    assert list(actual.columns) == list(expected.columns)
+    assert_same_metrics(actual, expected, NUMERIC_COLUMNS + ['max_cumulative_pnl', 'drawdown',
+                                                             'sentiment', 'sentiment_group'])
@@ -0,0 +1,53 @@
+"""
+Sorted-index filters against plain boolean masks
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from filters import FG_RANGE, Filters, apply_filters, sorted_layout
+from metrics import build_daily_metrics
+
+
+def mask_filter(frame, filters):
+    mask = np.ones(len(frame), dtype=bool)
+    if filters.start is not None:
+        mask &= (frame['date'] >= pd.Timestamp(filters.start)).values
+    if filters.end is not None:
+        mask &= (frame['date'] <= pd.Timestamp(filters.end)).values
+    if tuple(filters.fg_range) != FG_RANGE:
+        mask &= frame['fg_value'].between(*filters.fg_range).values
+    if filters.coins and 'Coin' in frame:
+        mask &= frame['Coin'].isin(filters.coins).values
+    if filters.accounts:
+        mask &= frame['Account'].isin(filters.accounts).values
+    return frame[mask]
+
+
+def cases(frame):
+    accounts = list(frame['Account'].cat.categories)
+    dates = frame['date'].sort_values()
+    middle = dates.iloc[len(dates) // 2].date()
+    return [
+        Filters(),
+        Filters(start=middle),
+        Filters(end=middle),
+        Filters(start=dates.iloc[len(dates) // 4].date(), end=middle),
+        Filters(fg_range=(20, 60)),
+        Filters(coins=('BTC', 'ETH')),
+        Filters(accounts=(accounts[0],)),
+        Filters(accounts=tuple(accounts[3:9:2]), start=middle, fg_range=(0, 70), coins=('SOL',)),
+        Filters(accounts=('0xnot-an-account',)),
+        Filters(start=dates.iloc[-1].date() + pd.Timedelta(days=1))
+    ]
+
+
+@pytest.mark.parametrize('table', ['trades', 'daily_metrics'])
+def test_apply_filters_matches_masks(trades_merged, table):
+    frame = trades_merged if table == 'trades' else build_daily_metrics(trades_merged)
+    layout, index = sorted_layout(frame)
+    for filters in cases(layout):
+        actual = apply_filters(layout, index, filters)
+        expected = mask_filter(layout, filters)
+        pd.testing.assert_frame_equal(actual.reset_index(drop=True), expected.reset_index(drop=True))
@@ -0,0 +1,60 @@
+"""
+Vectorized position reconstruction against a fill-by-fill loop
+"""
+
+import numpy as np
+import pandas as pd
+
+from positions import FLAT_TOLERANCE, position_metrics, reconstruct_positions
+
+
+def loop_positions(trades_merged):
+    """Walk each (Account, Coin)'s fills in timestamp order, one fill at a time."""
+    def side(position, scale):
+        return 0 if abs(position) <= FLAT_TOLERANCE * scale else np.sign(position)
+
+    trades = trades_merged.assign(Account=trades_merged['Account'].astype(str), Coin=trades_merged['Coin'].astype(str))
+    rows = []
+    for _, fills in trades.groupby(['Account', 'Coin'], sort=True):
+        fills = fills.sort_values('Timestamp IST', kind='stable')
+        position = float(fills['Start Position'].iloc[0])
+        previous_side, opened = None, None
+        for fill in fills.itertuples(index=False):
+            size = float(fill[fills.columns.get_loc('Size Tokens')])
+            delta = size if fill.Side == 'BUY' else -size
+            timestamp = fill[fills.columns.get_loc('Timestamp IST')]
+            before, position = position, position + delta
+            side_before = side(before, abs(delta)) if previous_side is None else previous_side
+            side_after = side(position, abs(delta))
+            opens = side_after != 0 and side_after != side_before
+            closes = side_before != 0 and side_after != side_before
+            holding = (timestamp - opened) / pd.Timedelta(hours=1) if closes and opened is not None else np.nan
+            reducing = side_before != 0 and np.sign(delta) == -side_before
+            price = float(fill[fills.columns.get_loc('Execution Price')])
+            reduced = min(abs(delta), abs(before)) * price if reducing else 0.0
+            if opens:
+                opened = timestamp
+            previous_side = side_after
+            rows.append((opens, closes, holding, reduced))
+    return pd.DataFrame(rows, columns=['opens', 'closes', 'holding_hours', 'reduced_notional'])
+
+
+def test_reconstruction_matches_loop(trades_merged):
+    fills = reconstruct_positions(trades_merged)
+    # Same (Account, Coin, timestamp) order as the loop, with string keys
+    fills = fills.assign(Account=fills['Account'].astype(str), Coin=fills['Coin'].astype(str))
+    fills = fills.sort_values(['Account', 'Coin'], kind='stable').reset_index(drop=True)
+    expected = loop_positions(trades_merged)
+
+    assert (fills['opens'].values == expected['opens'].values).all()
+    assert (fills['closes'].values == expected['closes'].values).all()
+    np.testing.assert_allclose(fills['holding_hours'], expected['holding_hours'], rtol=1e-9)
+    np.testing.assert_allclose(fills['reduced_notional'], expected['reduced_notional'], rtol=1e-5)
+
+
+def test_position_metrics_cover_every_trader_day(trades_merged):
+    metrics = position_metrics(trades_merged)
+    days = trades_merged.groupby(['Account', 'date'], observed=True).size()
+    assert len(metrics) == len(days)
+    closes = reconstruct_positions(trades_merged).groupby(['Account', 'date'], observed=True)['closes'].sum()
+    np.testing.assert_array_equal(metrics['positions_closed'].values, closes.values)